@@ -0,0 +1,278 @@
+import argparse
+import cProfile
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from fnmatch import fnmatch
+
+import q1
+import q2
+import q3
+
+
+# Registered benchmark cases by name: (sizes, setup)
+CASES = {}
+
+
+def register_case(name, sizes):
+    """
+    Decorator registering a benchmark case. The decorated function takes a size
+    and yields (func, ops): a zero-argument callable to time and how many
+    operations one call performs. Code after the yield is the teardown.
+    """
+    def decorator(setup):
+        CASES[name] = (tuple(sizes), contextmanager(setup))
+        return setup
+    return decorator
+
+
+@register_case("q1.insert", sizes=(1000, 10000, 100000))
+def _case_insert(size):
+    keys = q1.generate_ic_batch(size, 12, random.Random(0)).tolist()
+    table_size = q1._next_prime(size * 2)
+
+    def run():
+        table = q1.ICHashTable(table_size)
+        for key in keys:
+            table.insert(key, 12)
+
+    yield run, size
+
+
+def _hash_case(name):
+    def setup(size):
+        keys = q1.generate_ic_batch(size, 12, random.Random(0)).tolist()
+        hash_fn = q1.get_hash_function(name)
+
+        def run():
+            for key in keys:
+                hash_fn(key, 12)
+
+        yield run, size
+    return setup
+
+
+for _name in q1.HASH_FUNCTIONS:
+    register_case(f"q1.hash.{_name}", sizes=(10000,))(_hash_case(_name))
+
+
+@register_case("q2.addEdge", sizes=(1000, 10000, 100000))
+def _case_add_edge(size):
+    rng = random.Random(0)
+    edges = [(f"user{rng.randrange(size)}", f"user{rng.randrange(size)}") for _ in range(size * 10)]
+
+    def run():
+        graph = q2.Graph()
+        for source, destination in edges:
+            graph.addEdge(source, destination)
+
+    yield run, len(edges)
+
+
+@register_case("q2.get_followers", sizes=(1000, 10000, 100000))
+def _case_get_followers(size):
+    app = q2.build_random_app(size)
+    names = [f"user{i}" for i in random.Random(0).sample(range(size), 100)]
+
+    def run():
+        for name in names:
+            app.get_followers(name)
+
+    yield run, len(names)
+
+
+@register_case("q3.multithreading_round", sizes=(3,))
+def _case_multithreading_round(size):
+    yield q3.multithreading_round, size
+
+
+@register_case("q3.non_threading_round", sizes=(3,))
+def _case_non_threading_round(size):
+    yield q3.non_threading_round, size
+
+
+@register_case("q3.pool_round", sizes=(3,))
+def _case_pool_round(size):
+    with q3.WorkerPool(size) as pool:
+        yield pool.run_round, size
+
+
+def _backend_case(name):
+    def setup(size):
+        backend = q3.BACKENDS[name](os.cpu_count() or 1)
+        try:
+            yield (lambda: backend.run(size)), size
+        finally:
+            backend.close()
+    return setup
+
+
+for _name in q3.BACKENDS:
+    register_case(f"q3.backend.{_name}", sizes=(10000, 1000000))(_backend_case(_name))
+
+
+def select_cases(patterns=None, quick=False):
+    """(name, size) pairs for the cases matching any of the glob patterns; quick keeps only the smallest size"""
+    selected = []
+    for name, (sizes, _) in CASES.items():
+        if patterns and not any(fnmatch(name, pattern) for pattern in patterns):
+            continue
+        for size in sizes[:1] if quick else sizes:
+            selected.append((name, size))
+    return selected
+
+
+def run_case(name, size, rounds=10, warmup=2, profile_dir=None, trace_memory=False):
+    """
+    Time one case with the q3 harness. The result is the harness summary (ns per
+    call) plus ns_per_op; with trace_memory the peak traced allocation of one
+    call, and with profile_dir a cProfile dump of one call written there.
+    """
+    _, setup = CASES[name]
+    with setup(size) as (func, ops):
+        result = q3.benchmark(func, rounds, warmup)
+        result["size"] = size
+        result["ops"] = ops
+        result["ns_per_op"] = result["median"] / ops
+
+        if trace_memory:
+            tracemalloc.start()
+            func()
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        if profile_dir:
+            profiler = cProfile.Profile()
+            profiler.runcall(func)
+            os.makedirs(profile_dir, exist_ok=True)
+            path = os.path.join(profile_dir, f"{name}[{size}].prof")
+            profiler.dump_stats(path)
+            result["profile"] = path
+    return result
+
+
+def run_suite(patterns=None, rounds=10, warmup=2, quick=False, profile_dir=None, trace_memory=False):
+    """Run the selected cases and return them keyed "name[size]" along with the run environment"""
+    cases = {}
+    for name, size in select_cases(patterns, quick):
+        key = f"{name}[{size}]"
+        print(f"Running {key}...", file=sys.stderr)
+        cases[key] = run_case(name, size, rounds, warmup, profile_dir, trace_memory)
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "cases": cases,
+    }
+
+
+def compare_results(baseline, current, threshold=0.10):
+    """
+    Compare two suite results case by case on median ns per operation.
+    A case only counts as a regression (or improvement) when it moved by more
+    than threshold (a fraction) and the 95% intervals do not overlap.
+    """
+    rows = []
+    for key in dict.fromkeys([*baseline["cases"], *current["cases"]]):
+        old = baseline["cases"].get(key)
+        new = current["cases"].get(key)
+        if old is None or new is None:
+            rows.append({"case": key, "status": "new" if old is None else "missing",
+                         "baseline": old and old["ns_per_op"], "current": new and new["ns_per_op"],
+                         "change": None})
+            continue
+
+        change = new["ns_per_op"] / old["ns_per_op"] - 1
+        status = "ok"
+        if abs(change) > threshold and q3.is_significant(old, new):
+            status = "regression" if change > 0 else "improved"
+        rows.append({"case": key, "status": status, "baseline": old["ns_per_op"],
+                     "current": new["ns_per_op"], "change": change})
+    return rows
+
+
+def display_suite(results):
+    """Print one line per case"""
+    print(f"\n{'Case':<40} {'ns/op':>14} {'p95 ns/call':>16} {'Peak KiB':>10}")
+    for key, result in results["cases"].items():
+        peak = f"{result['peak_bytes'] / 1024:,.0f}" if "peak_bytes" in result else "-"
+        print(f"{key:<40} {result['ns_per_op']:>14,.1f} {result['p95']:>16,} {peak:>10}")
+
+
+def display_comparison(rows, threshold):
+    """Print the comparison and return how many cases regressed"""
+    print(f"\nAgainst baseline (threshold {threshold:.0%}):")
+    print(f"{'Case':<40} {'Baseline ns/op':>16} {'Current ns/op':>16} {'Change':>9}  Status")
+    for row in rows:
+        baseline = f"{row['baseline']:,.1f}" if row["baseline"] is not None else "-"
+        current = f"{row['current']:,.1f}" if row["current"] is not None else "-"
+        change = f"{row['change']:+.1%}" if row["change"] is not None else "-"
+        print(f"{row['case']:<40} {baseline:>16} {current:>16} {change:>9}  {row['status']}")
+    regressions = sum(row["status"] == "regression" for row in rows)
+    print(f"{regressions} regression(s)")
+    return regressions
+
+
+def _load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def parse_args(argv=None):
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Benchmark and regression suite for q1, q2 and q3")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="list the benchmark cases and their sizes")
+
+    run = commands.add_parser("run", help="run the suite, optionally saving it or checking it against a baseline")
+    run.add_argument("--cases", nargs="+", help="glob patterns of case names to run (default: all)")
+    run.add_argument("--rounds", type=int, default=10, help="timed rounds per case")
+    run.add_argument("--warmup", type=int, default=2, help="untimed warm-up calls per case")
+    run.add_argument("--quick", action="store_true", help="only the smallest size of each case")
+    run.add_argument("--output", help="write the results (a new baseline) to this JSON file")
+    run.add_argument("--baseline", help="compare against this JSON baseline; exit 1 on regressions")
+    run.add_argument("--threshold", type=float, default=0.10, help="relative slowdown counted as a regression")
+    run.add_argument("--profile", metavar="DIR", help="write a cProfile dump of each case to DIR")
+    run.add_argument("--trace-memory", action="store_true", help="record peak traced memory of each case")
+
+    compare = commands.add_parser("compare", help="compare two saved results")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.10)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.command == "list":
+        for name, (sizes, _) in CASES.items():
+            print(f"{name:<40} {', '.join(f'{size:,}' for size in sizes)}")
+        return 0
+
+    if args.command == "compare":
+        rows = compare_results(_load(args.baseline), _load(args.current), args.threshold)
+        return 1 if display_comparison(rows, args.threshold) else 0
+
+    results = run_suite(args.cases, args.rounds, args.warmup, args.quick, args.profile, args.trace_memory)
+    display_suite(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.baseline:
+        rows = compare_results(_load(args.baseline), results, args.threshold)
+        return 1 if display_comparison(rows, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,67 +1,802 @@
+import argparse
+import json
+import mmap
+import os
 import random
+import statistics
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import accumulate, chain, repeat
+
+from q3 import percentile
 
 
 class ICHashTable:
-    def __init__(self, size):
+    def __init__(self, size, max_load_factor=None, migrate_step=4, hash_function="folding", unique=False):
         self.size = size
+        # Key chains and payloads, parallel to each other. After a resize a
+        # bucket is None until its first key arrives, so None means empty.
         self.table = [[] for _ in range(size)]
+        self.values = [[] for _ in range(size)]
         self.collisions = 0
+        self.count = 0
 
-    def insert(self, ic_number, ic_format=None):
+        # unique=True makes the table an index: re-inserting an IC replaces its
+        # payload. Otherwise inserts just append (O(1), as the collision
+        # experiments need) and lookups return the first copy of an IC.
+        self.unique = unique
+
+        # Hash strategy chosen by name from HASH_FUNCTIONS
+        self.hash_function = hash_function
+        self._hash = get_hash_function(hash_function)
+
+        # Growth settings (max_load_factor=None keeps the table a fixed size)
+        self.max_load_factor = max_load_factor
+        self.migrate_step = migrate_step
+        self.resize_count = 0
+
+        # Old buckets still waiting to be moved into the grown table
+        self._old_table = None
+        self._old_values = None
+        self._migrate_pos = 0
+
+    @property
+    def load_factor(self):
+        """Number of stored ICs per bucket"""
+        return self.count / self.size
+
+    @property
+    def migration_progress(self):
+        """Fraction of old buckets moved after a resize (1.0 when idle)"""
+        if self._old_table is None:
+            return 1.0
+        return self._migrate_pos / len(self._old_table)
+
+    def insert(self, ic_number, ic_format=None, payload=None):
         # Determine which hash function to use based on IC length or format parameter
-        ic_str = str(ic_number)
-
-        # If format is specified, pad accordingly
-        if ic_format == 12:
-            ic_str = ic_str.zfill(12)  # Pad with leading zeros to make 12 digits
-            hash_code = hash_malaysian_ic_12(ic_str)
-        elif ic_format == 16:
-            ic_str = ic_str.zfill(16)  # Pad with leading zeros to make 16 digits
-            hash_code = hash_malaysian_ic_16(ic_str)
-        else:
-            # Auto-detect based on length (with padding consideration)
-            if len(ic_str) <= 12:
-                ic_str = ic_str.zfill(12)
-                hash_code = hash_malaysian_ic_12(ic_str)
-            elif len(ic_str) <= 16:
-                ic_str = ic_str.zfill(16)
-                hash_code = hash_malaysian_ic_16(ic_str)
-            else:
-                raise ValueError(f"Invalid IC length: {len(ic_str)}. Must be 12 or 16 digits or less.")
+        key, ic_format = _resolve_key(ic_number, ic_format)
+        return self._insert_hashed(_store_key(key, ic_format), self._hash(key, ic_format), payload)
+
+    def insert_many(self, ic_numbers, ic_format, payloads=None):
+        """
+        Insert a batch of integer ICs of one format (12 or 16).
+        Accepts a NumPy array, an array.array or any iterable of ints; the
+        hashes are computed in one pass with hash_many.
+        """
+        hash_codes = hash_many(ic_numbers, ic_format, self.hash_function)
+        ic_numbers = _stored_keys(ic_numbers, ic_format)
+        if payloads is None:
+            payloads = repeat(None)
+
+        if self.max_load_factor is not None or self._old_table is not None:
+            # Growth has to be checked after every key
+            for key, hash_code, payload in zip(ic_numbers, hash_codes.tolist(), payloads):
+                self._insert_hashed(key, hash_code, payload)
+            return
+
+        # Fixed-size table: scatter straight into the buckets
+        table = self.table
+        values = self.values
+        size = self.size
+        collisions = 0
+        count = 0
+        unique = self.unique
+        for key, hash_code, payload in zip(ic_numbers, hash_codes.tolist(), payloads):
+            index = hash_code % size
+            bucket = table[index]
+            if bucket:
+                collisions += 1
+                if unique and key in bucket:
+                    values[index][bucket.index(key)] = payload
+                    continue
+            elif bucket is None:
+                bucket = table[index] = []
+                values[index] = []
+            bucket.append(key)
+            values[index].append(payload)
+            count += 1
+        self.collisions += collisions
+        self.count += count
+
+    def _insert_hashed(self, key, hash_code, payload=None):
+        """Insert an integer IC whose hash code is already known"""
+        # Move a few old buckets across on every insert while resizing
+        if self._old_table is not None:
+            self._migrate(self.migrate_step)
 
         index = hash_code % self.size
 
         # Check for collision
-        if len(self.table[index]) > 0:
+        if self.table[index]:
             self.collisions += 1
 
+        # In a unique table an IC already stored just gets its payload replaced
+        if self.unique:
+            bucket, values, position = self._locate(key, hash_code)
+            if bucket is not None:
+                values[position] = payload
+                return index
+
         # Separate chaining for collision handling
-        self.table[index].append(ic_str)  # Store the padded string
+        self._append(index, key, payload)
+        self.count += 1
+
+        if self.max_load_factor is not None and self.load_factor > self.max_load_factor:
+            self._start_resize()
         return index
 
+    def _append(self, index, key, payload):
+        """Add a key and payload to a chain, creating it if the bucket is None"""
+        bucket = self.table[index]
+        if bucket is None:
+            self.table[index] = [key]
+            self.values[index] = [payload]
+        else:
+            bucket.append(key)
+            self.values[index].append(payload)
+
+    def _locate(self, key, hash_code):
+        """Find a key, returning (chain, payload chain, position) or (None, None, None)"""
+        index = hash_code % self.size
+        bucket = self.table[index]
+        if bucket and key in bucket:
+            return bucket, self.values[index], bucket.index(key)
+
+        # Buckets not migrated yet still live in the old table
+        if self._old_table is not None:
+            old_index = hash_code % len(self._old_table)
+            if old_index >= self._migrate_pos:
+                bucket = self._old_table[old_index]
+                if bucket and key in bucket:
+                    return bucket, self._old_values[old_index], bucket.index(key)
+        return None, None, None
+
+    def _find(self, ic_number, ic_format):
+        key, ic_format = _resolve_key(ic_number, ic_format)
+        return self._locate(_store_key(key, ic_format), self._hash(key, ic_format))
+
+    def contains(self, ic_number, ic_format=None):
+        """Check whether an IC is stored in the table"""
+        return self._find(ic_number, ic_format)[0] is not None
+
+    def __contains__(self, ic_number):
+        return self.contains(ic_number)
+
+    def get(self, ic_number, ic_format=None, default=None):
+        """
+        Return the payload stored with an IC, or default if it is missing.
+        Unless the table is unique, an IC inserted twice is stored twice and
+        this returns the payload of the first copy, not the latest one.
+        """
+        bucket, values, position = self._find(ic_number, ic_format)
+        if bucket is None:
+            return default
+        return values[position]
+
+    def remove(self, ic_number, ic_format=None):
+        """
+        Remove an IC and its payload, returning True if it was present.
+        Unless the table is unique, only the first copy of a repeated IC is
+        removed and the IC is still contained until every copy is gone.
+        """
+        bucket, values, position = self._find(ic_number, ic_format)
+        if bucket is None:
+            return False
+        del bucket[position]
+        del values[position]
+        self.count -= 1
+        return True
+
+    def __len__(self):
+        return self.count
+
+    def stats(self):
+        """
+        Summarise the chain length distribution in a single pass.
+        Only chain lengths are read (no strings are built), so this is cheap
+        enough to poll on large tables. While a resize is in progress the old
+        buckets that have not been migrated yet are included.
+        """
+        histogram = Counter(map(len, filter(None, self.table)))
+        buckets = self.size
+        if self._old_table is not None:
+            pending = self._old_table[self._migrate_pos:]
+            histogram.update(map(len, filter(None, pending)))
+            buckets += len(pending)
+        # Empty and not yet allocated buckets were skipped above
+        empty = buckets - sum(histogram.values())
+        if empty:
+            histogram[0] = empty
+
+        keys = sum(length * n for length, n in histogram.items())
+        used = buckets - histogram[0]
+        load_factor = keys / buckets
+
+        # Probes = key comparisons; a hit on the i-th key of a chain costs i,
+        # a miss that hashes like the stored keys scans the whole chain. Both
+        # are averaged per key, so with uniform hashing over m buckets they
+        # should come out at 1 + (keys - 1) / 2m and 1 + (keys - 1) / m.
+        hit_probes = sum(length * (length + 1) // 2 * n for length, n in histogram.items())
+        miss_probes = sum(length * length * n for length, n in histogram.items())
+
+        return {
+            "buckets": buckets,
+            "keys": keys,
+            "load_factor": load_factor,
+            "empty_bucket_ratio": histogram[0] / buckets,
+            "max_chain": max(histogram),
+            "mean_chain": keys / used if used else 0.0,
+            "histogram": dict(sorted(histogram.items())),
+            "expected_probes_hit": 1 + (keys - 1) / (2 * buckets) if keys else 0.0,
+            "observed_probes_hit": hit_probes / keys if keys else 0.0,
+            "expected_probes_miss": 1 + (keys - 1) / buckets if keys else 0.0,
+            "observed_probes_miss": miss_probes / keys if keys else 0.0,
+        }
+
+    def save(self, path):
+        """
+        Write the keys to a fixed-layout binary file: a header, then size + 1
+        bucket offsets, then every key packed as a 64-bit integer in bucket
+        order. Payloads are not saved. Open the file with MappedICHashTable
+        for zero-copy lookups or with ICHashTable.load to get a mutable table.
+        """
+        # The header stores the hash function name in 16 bytes
+        name = self.hash_function.encode("ascii")
+        if len(name) > 16:
+            raise ValueError(f"Hash function name {self.hash_function!r} is longer than 16 bytes and cannot be saved")
+
+        # Settle any pending resize so every key sits in its final bucket
+        if self._old_table is not None:
+            self._migrate(len(self._old_table))
+
+        offsets = array("Q", [0])
+        offsets.extend(accumulate(len(bucket) if bucket else 0 for bucket in self.table))
+        keys = array("Q", chain.from_iterable(filter(None, self.table)))
+        if sys.byteorder == "big":
+            offsets.byteswap()
+            keys.byteswap()
+
+        with open(path, "wb") as f:
+            f.write(_FILE_HEADER.pack(_FILE_MAGIC, _FILE_VERSION, self.size, self.count, name))
+            offsets.tofile(f)
+            keys.tofile(f)
+
+    @classmethod
+    def load(cls, path, unique=False):
+        """Rebuild a mutable table from a file written by save()"""
+        with MappedICHashTable(path) as mapped:
+            table = cls(mapped.size, hash_function=mapped.hash_function, unique=unique)
+            offsets = mapped.offsets.tolist()
+            keys = mapped.keys.tolist()
+
+        table.table = [keys[offsets[i]:offsets[i + 1]] for i in range(table.size)]
+        table.values = [[None] * len(bucket) for bucket in table.table]
+        table.count = len(keys)
+        # Every key after the first in a bucket was a collision when inserted
+        table.collisions = table.count - (table.size - table.table.count([]))
+        return table
+
+    def clear(self):
+        """Empty the table and reset the collision counter"""
+        if self._old_table is not None:
+            self._migrate(len(self._old_table))
+        for bucket in filter(None, self.table):
+            bucket.clear()
+        for values in filter(None, self.values):
+            values.clear()
+        self.collisions = 0
+        self.count = 0
+
+    def _start_resize(self):
+        """Switch to a table of the next prime size and begin migrating"""
+        # A previous resize must be finished before starting another one
+        if self._old_table is not None:
+            self._migrate(len(self._old_table))
+
+        self._old_table = self.table
+        self._old_values = self.values
+        self._migrate_pos = 0
+        self.size = _next_prime(self.size * 2)
+        # Chains are created on first use, so the insert that triggers the
+        # resize does not have to allocate millions of empty lists
+        self.table = [None] * self.size
+        self.values = [None] * self.size
+        self.resize_count += 1
+
+    def _migrate(self, steps):
+        """Rehash up to `steps` old buckets into the current table"""
+        old_table = self._old_table
+        old_values = self._old_values
+        stop = min(self._migrate_pos + steps, len(old_table))
+        for i in range(self._migrate_pos, stop):
+            if old_table[i]:
+                for key, payload in zip(old_table[i], old_values[i]):
+                    self._append(self._hash(*_split_key(key)) % self.size, key, payload)
+            # Release the old bucket
+            old_table[i] = None
+            old_values[i] = None
+        self._migrate_pos = stop
+
+        if stop == len(old_table):
+            self._old_table = None
+            self._old_values = None
+            self._migrate_pos = 0
+
     def display_sample(self):
         """Display a sample of the hash table (first 10 and last 5 entries)"""
         print(f"Hash Table with size {self.size}:")
 
         # Display first 11 entries (index 0-10)
         for i in range(11):
-            if len(self.table[i]) == 0:
+            if not self.table[i]:
                 print(f"table[{i}]")
             else:
-                chain = " --> ".join(self.table[i])
+                chain = " --> ".join(map(_format_key, self.table[i]))
                 print(f"table[{i}] --> {chain}")
 
         print("...")
 
         # Display last 5 entries
         for i in range(self.size - 5, self.size):
-            if len(self.table[i]) == 0:
+            if not self.table[i]:
                 print(f"table[{i}]")
             else:
-                chain = " --> ".join(self.table[i])
+                chain = " --> ".join(map(_format_key, self.table[i]))
                 print(f"table[{i}] --> {chain}")
 
 
+class OpenAddressingICHashTable:
+    """
+    Open addressing variant of ICHashTable for very large IC workloads.
+    ICs are stored as 64-bit integers in a flat array and collisions are
+    resolved with linear probing, so there are no per-bucket lists or
+    padded strings to allocate.
+
+    The table has a fixed capacity of `size` ICs and insert raises
+    OverflowError once every slot is taken. It defaults to the xxhash mix:
+    folding only yields a few thousand (12-digit) or tens of thousands
+    (16-digit) distinct values, and linear probing turns that into one huge
+    cluster on any bigger table.
+    """
+
+    EMPTY = -1
+
+    def __init__(self, size, hash_function="xxhash"):
+        self.size = size
+        self.slots = array("q", [self.EMPTY]) * size
+        self.count = 0
+        self.collisions = 0
+        self.hash_function = hash_function
+        self._hash = get_hash_function(hash_function)
+
+    def insert(self, ic_number, ic_format=None):
+        """Insert an IC and return the slot it was stored in"""
+        key, ic_format = _resolve_key(ic_number, ic_format)
+        index = self._hash(key, ic_format) % self.size
+        key = _store_key(key, ic_format)
+
+        # Same meaning as ICHashTable: the home bucket was already taken
+        if self.slots[index] != self.EMPTY:
+            self.collisions += 1
+
+        # Linear probing until we find the key or an empty slot
+        for _ in range(self.size):
+            current = self.slots[index]
+            if current == key:
+                return index  # Already stored
+            if current == self.EMPTY:
+                self.slots[index] = key
+                self.count += 1
+                return index
+            index = (index + 1) % self.size
+
+        raise OverflowError(f"Hash table is full ({self.size} slots)")
+
+    def lookup(self, ic_number, ic_format=None):
+        """Return the slot holding the IC, or None if it is not stored"""
+        key, ic_format = _resolve_key(ic_number, ic_format)
+        index = self._hash(key, ic_format) % self.size
+        key = _store_key(key, ic_format)
+
+        for _ in range(self.size):
+            current = self.slots[index]
+            if current == key:
+                return index
+            if current == self.EMPTY:
+                return None
+            index = (index + 1) % self.size
+        return None
+
+    def delete(self, ic_number, ic_format=None):
+        """Remove an IC from the table, returning True if it was present"""
+        index = self.lookup(ic_number, ic_format)
+        if index is None:
+            return False
+
+        # Backward-shift deletion: pull later entries of the probe run back
+        # into the gap so lookups never need tombstones
+        self.slots[index] = self.EMPTY
+        self.count -= 1
+        gap = index
+        probe = (index + 1) % self.size
+        while self.slots[probe] != self.EMPTY:
+            key = self.slots[probe]
+            home = self._hash(*_split_key(key)) % self.size
+            # Move the entry only if the gap lies on its probe path
+            if (probe - home) % self.size >= (probe - gap) % self.size:
+                self.slots[gap] = key
+                self.slots[probe] = self.EMPTY
+                gap = probe
+            probe = (probe + 1) % self.size
+        return True
+
+    def __len__(self):
+        return self.count
+
+
+class ConcurrentICHashTable(ICHashTable):
+    """
+    Fixed-size ICHashTable that can be shared between threads.
+    Buckets are split into contiguous ranges (stripes), each guarded by its
+    own lock, so readers and writers only wait for each other when they touch
+    the same stripe. Collision and key counters are kept per stripe and
+    summed on read. Unlike ICHashTable it is unique by default, so threads
+    that insert the same IC replace its payload instead of adding a copy.
+    """
+
+    def __init__(self, size, stripes=16, hash_function="folding", unique=True):
+        self.stripes = min(stripes, size)
+        self._locks = [threading.Lock() for _ in range(self.stripes)]
+        self._stripe_collisions = [0] * self.stripes
+        self._stripe_counts = [0] * self.stripes
+        super().__init__(size, hash_function=hash_function, unique=unique)
+
+    @property
+    def collisions(self):
+        return sum(self._stripe_collisions)
+
+    @collisions.setter
+    def collisions(self, value):
+        self._stripe_collisions = [value] + [0] * (self.stripes - 1)
+
+    @property
+    def count(self):
+        return sum(self._stripe_counts)
+
+    @count.setter
+    def count(self, value):
+        self._stripe_counts = [value] + [0] * (self.stripes - 1)
+
+    def _stripe(self, index):
+        """Stripe that owns a bucket index"""
+        return index * self.stripes // self.size
+
+    def insert_many(self, ic_numbers, ic_format, payloads=None):
+        """Insert a batch of integer ICs of one format, locking per key"""
+        hash_codes = hash_many(ic_numbers, ic_format, self.hash_function)
+        ic_numbers = _stored_keys(ic_numbers, ic_format)
+        if payloads is None:
+            payloads = repeat(None)
+        for key, hash_code, payload in zip(ic_numbers, hash_codes.tolist(), payloads):
+            self._insert_hashed(key, hash_code, payload)
+
+    def _insert_hashed(self, key, hash_code, payload=None):
+        index = hash_code % self.size
+        stripe = self._stripe(index)
+        with self._locks[stripe]:
+            bucket = self.table[index]
+            if bucket:
+                self._stripe_collisions[stripe] += 1
+                if self.unique and key in bucket:
+                    self.values[index][bucket.index(key)] = payload
+                    return index
+            bucket.append(key)
+            self.values[index].append(payload)
+            self._stripe_counts[stripe] += 1
+        return index
+
+    def contains(self, ic_number, ic_format=None):
+        """Check whether an IC is stored in the table"""
+        key, ic_format = _resolve_key(ic_number, ic_format)
+        index = self._hash(key, ic_format) % self.size
+        key = _store_key(key, ic_format)
+        with self._locks[self._stripe(index)]:
+            return key in self.table[index]
+
+    def get(self, ic_number, ic_format=None, default=None):
+        """Return the payload stored with an IC, or default if it is missing"""
+        key, ic_format = _resolve_key(ic_number, ic_format)
+        index = self._hash(key, ic_format) % self.size
+        key = _store_key(key, ic_format)
+        with self._locks[self._stripe(index)]:
+            bucket = self.table[index]
+            if key not in bucket:
+                return default
+            return self.values[index][bucket.index(key)]
+
+    def remove(self, ic_number, ic_format=None):
+        """Remove an IC and its payload, returning True if it was present"""
+        key, ic_format = _resolve_key(ic_number, ic_format)
+        index = self._hash(key, ic_format) % self.size
+        key = _store_key(key, ic_format)
+        stripe = self._stripe(index)
+        with self._locks[stripe]:
+            bucket = self.table[index]
+            if key not in bucket:
+                return False
+            position = bucket.index(key)
+            del bucket[position]
+            del self.values[index][position]
+            self._stripe_counts[stripe] -= 1
+        return True
+
+    def clear(self):
+        """Empty the table and reset the counters, holding every stripe lock"""
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            super().clear()
+        finally:
+            for lock in self._locks:
+                lock.release()
+
+
+# On-disk layout written by ICHashTable.save (little-endian):
+# header | (size + 1) x uint64 bucket offsets | count x uint64 keys
+_FILE_MAGIC = b"ICHT"
+_FILE_VERSION = 1
+_FILE_HEADER = struct.Struct("<4sHxxQQ16s")  # magic, version, size, count, hash function name
+
+
+class MappedICHashTable:
+    """
+    Read-only view of a table saved with ICHashTable.save.
+    The file is memory-mapped and the offsets and keys are read in place,
+    so opening it costs the same no matter how many ICs it holds.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, size, count, name = _FILE_HEADER.unpack_from(self._mmap)
+        if magic != _FILE_MAGIC or version != _FILE_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not an IC hash table file (version {_FILE_VERSION})")
+        if sys.byteorder == "big":
+            self._mmap.close()
+            raise ValueError("Memory-mapped tables require a little-endian machine")
+
+        self.size = size
+        self.count = count
+        self.hash_function = name.rstrip(b"\0").decode("ascii")
+        self._hash = get_hash_function(self.hash_function)
+
+        view = memoryview(self._mmap)
+        offsets_start = _FILE_HEADER.size
+        keys_start = offsets_start + (size + 1) * 8
+        self.offsets = view[offsets_start:keys_start].cast("Q")
+        self.keys = view[keys_start:keys_start + count * 8].cast("Q")
+        view.release()
+
+    def contains(self, ic_number, ic_format=None):
+        """Check whether an IC is stored in the table"""
+        key, ic_format = _resolve_key(ic_number, ic_format)
+        index = self._hash(key, ic_format) % self.size
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return _store_key(key, ic_format) in self.keys[start:end]
+
+    def __contains__(self, ic_number):
+        return self.contains(ic_number)
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        """Release the views and unmap the file"""
+        self.offsets.release()
+        self.keys.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _next_prime(n):
+    """Return the smallest prime greater than or equal to n"""
+    candidate = max(n, 2)
+    while True:
+        if all(candidate % d for d in range(2, int(candidate ** 0.5) + 1)):
+            return candidate
+        candidate += 1
+
+
+def _resolve_ic(ic_number, ic_format=None):
+    """Pad an IC to its format and return (padded string, format)"""
+    ic_str = str(ic_number)
+
+    # If format is specified, pad accordingly
+    if ic_format == 12:
+        return ic_str.zfill(12), 12  # Pad with leading zeros to make 12 digits
+    if ic_format == 16:
+        return ic_str.zfill(16), 16  # Pad with leading zeros to make 16 digits
+
+    # Auto-detect based on length (with padding consideration)
+    if len(ic_str) <= 12:
+        return ic_str.zfill(12), 12
+    if len(ic_str) <= 16:
+        return ic_str.zfill(16), 16
+    raise ValueError(f"Invalid IC length: {len(ic_str)}. Must be 12 or 16 digits or less.")
+
+
+def _resolve_key(ic_number, ic_format=None):
+    """Return (integer key, format) for an IC given as a string or an int"""
+    # Integers that already fit the format skip the string round trip
+    if type(ic_number) is int and 0 <= ic_number < 10 ** 16:
+        if ic_format is None:
+            ic_format = _key_format(ic_number)
+        if ic_format == 16 or (ic_format == 12 and ic_number < 10 ** 12):
+            return ic_number, ic_format
+
+    ic_str, ic_format = _resolve_ic(ic_number, ic_format)
+    return int(ic_str), ic_format
+
+
+def _format_key(key):
+    """Zero-pad a stored integer IC back to its 12 or 16 digit form"""
+    key, ic_format = _split_key(key)
+    return str(key).zfill(ic_format)
+
+
+def _key_format(key):
+    """
+    Work out the IC format of an integer-encoded key.
+    16-digit ICs start with a four-digit year, so they never fit in 12 digits.
+    """
+    return 12 if key < 10 ** 12 else 16
+
+
+# A 16-digit IC below 10**12 (e.g. a zero-padded string) would be taken for a
+# 12-digit one by _key_format, so tables store it offset by this tag. Real
+# keys are always below it, which keeps stored keys of both formats distinct.
+_FORMAT_16_TAG = 10 ** 16
+
+
+def _store_key(key, ic_format):
+    """Integer a table stores for a key of the given format"""
+    if ic_format == 16 and key < 10 ** 12:
+        return key + _FORMAT_16_TAG
+    return key
+
+
+def _split_key(stored):
+    """(key, format) of an integer stored by a table, undoing _store_key"""
+    if stored >= _FORMAT_16_TAG:
+        return stored - _FORMAT_16_TAG, 16
+    return stored, _key_format(stored)
+
+
+def _stored_keys(ic_numbers, ic_format):
+    """A batch of integer ICs of one format as the list of keys a table stores"""
+    if hasattr(ic_numbers, "tolist"):
+        ic_numbers = ic_numbers.tolist()
+    if ic_format == 16:
+        return [_store_key(key, 16) for key in ic_numbers]
+    return ic_numbers
+
+
+def _fold_12(ic):
+    """Folding hash of a 12-digit IC held as an integer (sum of 3-digit parts)"""
+    return ic // 1000000000 + ic // 1000000 % 1000 + ic // 1000 % 1000 + ic % 1000
+
+
+def _fold_16(ic):
+    """Folding hash of a 16-digit IC held as an integer (sum of 4-digit parts)"""
+    return ic // 1000000000000 + ic // 100000000 % 10000 + ic // 10000 % 10000 + ic % 10000
+
+
+def hash_many(ic_numbers, ic_format, hash_function="folding"):
+    """
+    Hash a batch of integer ICs of one format.
+    Folding gives the same values as hash_malaysian_ic_12 / hash_malaysian_ic_16
+    on the zero-padded strings, using integer division instead of slicing.
+    A NumPy array is folded in a single vectorized expression and returned as
+    an array; otherwise the result is an array.array of unsigned 64-bit ints.
+    """
+    if ic_format not in (12, 16):
+        raise ValueError(f"Invalid IC format: {ic_format}. Must be 12 or 16.")
+
+    if hash_function == "folding":
+        fold = _fold_12 if ic_format == 12 else _fold_16
+        # NumPy arrays support the same integer operators element-wise
+        if hasattr(ic_numbers, "dtype"):
+            return fold(ic_numbers)
+        return array("Q", map(fold, ic_numbers))
+
+    hash_fn = get_hash_function(hash_function)
+    if hasattr(ic_numbers, "tolist"):
+        ic_numbers = ic_numbers.tolist()
+    return array("Q", (hash_fn(ic, ic_format) for ic in ic_numbers))
+
+
+# Registry of hash strategies selectable by name on ICHashTable.
+# Every strategy takes (integer IC, format) and returns a non-negative int.
+HASH_FUNCTIONS = {}
+
+_MASK_64 = (1 << 64) - 1
+
+
+def register_hash_function(name):
+    """Decorator adding a hash strategy to HASH_FUNCTIONS"""
+    def decorator(func):
+        HASH_FUNCTIONS[name] = func
+        return func
+    return decorator
+
+
+def get_hash_function(name):
+    """Look up a registered hash strategy by name"""
+    if name not in HASH_FUNCTIONS:
+        raise ValueError(f"Unknown hash function: {name!r}. Choose from {sorted(HASH_FUNCTIONS)}.")
+    return HASH_FUNCTIONS[name]
+
+
+@register_hash_function("folding")
+def _folding_hash(ic, ic_format):
+    """The original folding technique (sum of 3- or 4-digit parts)"""
+    return _fold_12(ic) if ic_format == 12 else _fold_16(ic)
+
+
+@register_hash_function("multiplicative")
+def _multiplicative_hash(ic, ic_format):
+    """Knuth multiplicative hashing with the 64-bit golden ratio constant"""
+    return ((ic * 0x9E3779B97F4A7C15) & _MASK_64) >> 32
+
+
+@register_hash_function("fnv1a")
+def _fnv1a_hash(ic, ic_format):
+    """64-bit FNV-1a over the ASCII digits of the padded IC"""
+    hash_value = 0xCBF29CE484222325
+    for byte in b"%0*d" % (ic_format, ic):
+        hash_value = ((hash_value ^ byte) * 0x100000001B3) & _MASK_64
+    return hash_value
+
+
+@register_hash_function("xxhash")
+def _xxhash_mix(ic, ic_format):
+    """xxHash64-style avalanche mixing of the integer IC"""
+    hash_value = (ic + 0x27D4EB2F165667C5) & _MASK_64
+    hash_value ^= hash_value >> 33
+    hash_value = (hash_value * 0xC2B2AE3D27D4EB4F) & _MASK_64
+    hash_value ^= hash_value >> 29
+    hash_value = (hash_value * 0x165667B19E3779F9) & _MASK_64
+    hash_value ^= hash_value >> 32
+    return hash_value
+
+
+# Carter-Wegman parameters are drawn once from a fixed seed so every process
+# (and every saved table) agrees on the same member of the hash family
+_UNIVERSAL_PRIME = (1 << 61) - 1
+_universal_rng = random.Random(5003)
+_UNIVERSAL_A = _universal_rng.randrange(1, _UNIVERSAL_PRIME)
+_UNIVERSAL_B = _universal_rng.randrange(0, _UNIVERSAL_PRIME)
+
+
+@register_hash_function("universal")
+def _universal_hash(ic, ic_format):
+    """Carter-Wegman universal hashing: (a * ic + b) mod p"""
+    return (_UNIVERSAL_A * ic + _UNIVERSAL_B) % _UNIVERSAL_PRIME
+
+
 def hash_malaysian_ic_12(ic_number):
     """
     Hash function for 12-digit Malaysian IC number using folding technique
@@ -98,6 +833,13 @@ def hash_malaysian_ic_16(ic_number):
     return hash_value
 
 
+# Valid birth place (BP) codes
+BP_CODES = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16,
+            21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 34, 35,
+            36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50,
+            51, 52, 53, 54, 55, 56, 57, 58, 59]
+
+
 def generate_random_ic_12():
     """Generate a random 12-digit Malaysian IC number."""
     # Generate birth date (YYMMDD)
@@ -112,11 +854,7 @@ def generate_random_ic_12():
     day = random.randint(1, 28)  # Safe range for all months
 
     # Generate birth place (BP) - random from valid codes
-    bp_codes = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16,
-                21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 34, 35,
-                36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50,
-                51, 52, 53, 54, 55, 56, 57, 58, 59]
-    bp = random.choice(bp_codes)
+    bp = random.choice(BP_CODES)
 
     # Generate serial number (3 digits) and gender digit
     serial = random.randint(0, 999)
@@ -135,11 +873,7 @@ def generate_random_ic_16():
     day = random.randint(1, 28)  # Safe range for all months
 
     # Generate birth place (BP) - random from valid codes
-    bp_codes = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16,
-                21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 34, 35,
-                36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50,
-                51, 52, 53, 54, 55, 56, 57, 58, 59]
-    bp = random.choice(bp_codes)
+    bp = random.choice(BP_CODES)
 
     # Generate serial number (4 digits) and gender digits (2 digits)
     serial = random.randint(0, 9999)
@@ -150,6 +884,446 @@ def generate_random_ic_16():
     return ic_number
 
 
+# The batch generator packs one IC per 128-bit lane of a big int. Each lane
+# holds a 76-bit random fraction; drawing a field of n values (n < 2**20)
+# moves it into the bits above, and the finished IC (< 2**51) fits there too.
+_LANE_BYTES = 16
+_FRACTION_BITS = 76
+_LANES_PER_CHUNK = 4096  # Keeps each big int (64 KiB) cache-sized
+
+
+@lru_cache(maxsize=16)
+def _lanes(value, count):
+    """An int holding `value` in each of `count` little-endian 128-bit lanes"""
+    return int.from_bytes(value.to_bytes(_LANE_BYTES, "little") * count, "little")
+
+
+def generate_ic_batch(count, ic_format=12, rng=None):
+    """
+    Generate `count` random ICs as an array of 64-bit integers, with the same
+    field distributions as generate_random_ic_12 / generate_random_ic_16.
+    Pass a random.Random instance as rng for reproducible output.
+    """
+    if ic_format not in (12, 16):
+        raise ValueError(f"Invalid IC format: {ic_format}. Must be 12 or 16.")
+    rng = rng or random
+    ics = array("q")
+    for start in range(0, count, _LANES_PER_CHUNK):
+        ics.extend(_generate_ic_lanes(min(_LANES_PER_CHUNK, count - start), ic_format, rng))
+    return ics
+
+
+def _generate_ic_lanes(count, ic_format, rng):
+    """
+    One chunk of generate_ic_batch. The chunk is a single big int with one IC
+    per 128-bit lane, so every step below is a handful of big-int operations
+    over all lanes and no Python code runs per IC. Each lane starts as a
+    uniform random fraction f; a field of n values is floor(f * n) and the
+    fractional part f * n mod 1 feeds the next field (multiply-shift), which
+    is uniform to within 1e-11. Fields stay scaled by 2**_FRACTION_BITS until
+    the IC is assembled.
+    """
+    ics = array("q")
+    fraction_mask = _lanes((1 << _FRACTION_BITS) - 1, count)
+    fraction = rng.getrandbits(8 * _LANE_BYTES * count) & fraction_mask
+
+    def draw(n):
+        """Lanes uniform over range(n) (scaled), consuming part of each fraction"""
+        nonlocal fraction
+        scaled = fraction * n
+        fraction = scaled & fraction_mask
+        return scaled ^ fraction
+
+    def lanes(value):
+        return _lanes(value << _FRACTION_BITS, count)
+
+    month = draw(12)
+    day = draw(28)
+    # BP_CODES is 1-16 then 21-59, so indices 16 and up (those where bit 6
+    # of index + 48 is set) skip 4 more
+    bp_index = draw(len(BP_CODES))
+    bp = bp_index + (((bp_index + lanes(48)) & lanes(64)) >> 4)
+
+    if ic_format == 12:
+        # Half from 1970-1999 and half from 2000-2020: pick a century per
+        # lane by masking the gap between the two candidate years
+        century = draw(2) * 127
+        year_2000s = draw(21)
+        year_1900s = draw(30) + lanes(70)
+        year = year_2000s + ((year_1900s - year_2000s) & century)
+        # Serial number (3 digits) and gender digit
+        packed = (((year * 100 + month) * 100 + day) * 100 + bp) * 10 ** 4 + draw(10 ** 4)
+        # Month, day and BP were drawn from 0
+        packed += lanes(((1 * 100 + 1) * 100 + 1) * 10 ** 4)
+    else:
+        year = draw(74)
+        # Serial number (4 digits) and gender digits (2 digits)
+        packed = (((year * 100 + month) * 100 + day) * 100 + bp) * 10 ** 6 + draw(10 ** 6)
+        packed += lanes((((1950 * 100 + 1) * 100 + 1) * 100 + 1) * 10 ** 6)
+
+    # Every IC is below 2**63, so the low 8 bytes of each lane are the result
+    ics.frombytes((packed >> _FRACTION_BITS).to_bytes(_LANE_BYTES * count, "little"))
+    if sys.byteorder == "big":
+        ics.byteswap()
+    return ics[::2]
+
+
+def iter_ic_batches(total, ic_format=12, batch_size=65536, seed=None):
+    """
+    Stream `total` random ICs in batches of at most batch_size.
+    Only one batch is held in memory at a time; the same seed always
+    yields the same ICs.
+    """
+    rng = random.Random(seed)
+    remaining = total
+    while remaining > 0:
+        count = min(batch_size, remaining)
+        yield generate_ic_batch(count, ic_format, rng)
+        remaining -= count
+
+
+def benchmark_hash_functions(names=None, table_sizes=(1009, 2003), n_keys=1000, ic_format=12):
+    """
+    Compare hash strategies on the same random ICs.
+    Returns one result dict per (strategy, table size) with the time per hash,
+    collision rate, longest chain and chi-squared bucket uniformity.
+    """
+    keys = generate_ic_batch(n_keys, ic_format).tolist()
+
+    results = []
+    for name in names or HASH_FUNCTIONS:
+        hash_fn = get_hash_function(name)
+
+        start = time.perf_counter_ns()
+        hash_codes = [hash_fn(key, ic_format) for key in keys]
+        ns_per_hash = (time.perf_counter_ns() - start) / n_keys
+
+        for size in table_sizes:
+            chain_lengths = [0] * size
+            for hash_code in hash_codes:
+                chain_lengths[hash_code % size] += 1
+
+            # Every key that lands in an already used bucket is a collision
+            used_buckets = size - chain_lengths.count(0)
+            collisions = n_keys - used_buckets
+            expected = n_keys / size
+            chi_squared = sum((length - expected) ** 2 for length in chain_lengths) / expected
+
+            results.append({
+                "hash_function": name,
+                "table_size": size,
+                "ns_per_hash": ns_per_hash,
+                "collisions": collisions,
+                "collision_rate": collisions / n_keys * 100,
+                "longest_chain": max(chain_lengths),
+                "chi_squared": chi_squared,
+                "degrees_of_freedom": size - 1,
+            })
+    return results
+
+
+def run_hash_benchmark(table_sizes=(1009, 2003), n_keys=1000):
+    """Print the hash strategy benchmark for both IC formats"""
+    for ic_format in (12, 16):
+        print("=" * 90)
+        print(f"HASH FUNCTION BENCHMARK - {ic_format}-DIGIT IC ({n_keys} keys)")
+        print("=" * 90)
+        print(f"{'Hash function':<16}{'Size':>8}{'ns/hash':>10}{'Collisions':>12}"
+              f"{'Rate %':>9}{'Longest':>9}{'Chi^2':>12}{'Chi^2/df':>10}")
+        for row in benchmark_hash_functions(None, table_sizes, n_keys, ic_format):
+            print(f"{row['hash_function']:<16}{row['table_size']:>8}{row['ns_per_hash']:>10.1f}"
+                  f"{row['collisions']:>12}{row['collision_rate']:>9.2f}{row['longest_chain']:>9}"
+                  f"{row['chi_squared']:>12.1f}{row['chi_squared'] / row['degrees_of_freedom']:>10.2f}")
+        print()
+
+
+def benchmark_lookups(sizes=(100_000, 1_000_000), n_queries=100_000, ic_format=12, hash_function="xxhash"):
+    """
+    Measure ICHashTable.get latency on tables holding `sizes` keys.
+    Each table gets roughly one bucket per key; half of the queries hit
+    stored ICs and half miss. Returns p50/p99 latency in nanoseconds.
+    A table costs about 200 MB per million keys (two lists per bucket).
+    The default hash is a mixing one: folding leaves most buckets empty on
+    tables this size, so lookups would time chain scans instead.
+    """
+    results = []
+    for n_keys in sizes:
+        keys = generate_ic_batch(n_keys, ic_format)
+        table = ICHashTable(_next_prime(n_keys), hash_function=hash_function)
+        table.insert_many(keys, ic_format)
+
+        hits = random.choices(keys.tolist(), k=n_queries // 2)
+        misses = generate_ic_batch(n_queries - len(hits), ic_format).tolist()
+
+        timings = {}
+        for label, queries in (("hit", hits), ("miss", misses)):
+            latencies = []
+            for ic in queries:
+                start = time.perf_counter_ns()
+                table.get(ic, ic_format)
+                latencies.append(time.perf_counter_ns() - start)
+            latencies.sort()
+            timings[label] = latencies
+
+        results.append({
+            "keys": n_keys,
+            "hit_p50_ns": percentile(timings["hit"], 50),
+            "hit_p99_ns": percentile(timings["hit"], 99),
+            "miss_p50_ns": percentile(timings["miss"], 50),
+            "miss_p99_ns": percentile(timings["miss"], 99),
+        })
+    return results
+
+
+def run_lookup_benchmark(sizes=(100_000, 1_000_000), n_queries=100_000, hash_function="xxhash"):
+    """Print p50/p99 lookup latency for each table size"""
+    print(f"Hash function: {hash_function}")
+    print(f"{'Keys':>12}{'Hit p50 (ns)':>15}{'Hit p99 (ns)':>15}{'Miss p50 (ns)':>16}{'Miss p99 (ns)':>16}")
+    for row in benchmark_lookups(sizes, n_queries, hash_function=hash_function):
+        print(f"{row['keys']:>12,}{row['hit_p50_ns']:>15,}{row['hit_p99_ns']:>15,}"
+              f"{row['miss_p50_ns']:>16,}{row['miss_p99_ns']:>16,}")
+
+
+# Tables reused across the rounds a worker process runs, keyed by (size, hash function)
+_EXPERIMENT_TABLES = {}
+
+
+def _run_experiment_round(task):
+    """
+    Run one round of the collision experiment inside a worker.
+    The same random ICs go into every table size and hash function, like
+    main() does, and the RNG is seeded from the task so results do not
+    depend on which worker picks the round up.
+    """
+    ic_format, n_keys, round_num, table_sizes, hash_functions, seed = task
+    rng = random.Random(f"{seed}:{ic_format}:{n_keys}:{round_num}")
+    ics = generate_ic_batch(n_keys, ic_format, rng)
+
+    results = []
+    for hash_function in hash_functions:
+        for size in table_sizes:
+            table = _EXPERIMENT_TABLES.get((size, hash_function))
+            if table is None:
+                table = _EXPERIMENT_TABLES[size, hash_function] = ICHashTable(size, hash_function=hash_function)
+            table.clear()
+
+            start = time.perf_counter_ns()
+            table.insert_many(ics, ic_format)
+            elapsed = time.perf_counter_ns() - start
+            results.append((ic_format, size, n_keys, hash_function, table.collisions, elapsed))
+    return results
+
+
+def run_experiments(formats=(12, 16), table_sizes=(1009, 2003), rounds=10, key_counts=(1000,),
+                    hash_functions=("folding",), workers=None, seed=0):
+    """
+    Run the collision experiment over a grid of settings.
+    Rounds are spread over a ProcessPoolExecutor (workers=1 runs them in this
+    process). Returns one summary dict per (format, table size, key count,
+    hash function) with collision statistics and insert timings.
+    """
+    tasks = [(ic_format, n_keys, round_num, tuple(table_sizes), tuple(hash_functions), seed)
+             for ic_format in formats
+             for n_keys in key_counts
+             for round_num in range(rounds)]
+
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        outputs = list(map(_run_experiment_round, tasks))
+    else:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(_run_experiment_round, tasks, chunksize=chunksize))
+
+    # Group the per-round results by grid cell
+    cells = {}
+    for round_results in outputs:
+        for ic_format, size, n_keys, hash_function, collisions, elapsed in round_results:
+            cell = cells.setdefault((ic_format, size, n_keys, hash_function), ([], []))
+            cell[0].append(collisions)
+            cell[1].append(elapsed)
+
+    summary = []
+    for (ic_format, size, n_keys, hash_function), (collisions, elapsed) in cells.items():
+        collisions.sort()
+        mean = statistics.fmean(collisions)
+        summary.append({
+            "ic_format": ic_format,
+            "table_size": size,
+            "keys": n_keys,
+            "hash_function": hash_function,
+            "rounds": len(collisions),
+            "mean_collisions": mean,
+            "stdev_collisions": statistics.stdev(collisions) if len(collisions) > 1 else 0.0,
+            "min_collisions": collisions[0],
+            "p50_collisions": percentile(collisions, 50),
+            "p95_collisions": percentile(collisions, 95),
+            "p99_collisions": percentile(collisions, 99),
+            "max_collisions": collisions[-1],
+            "collision_rate": mean / n_keys * 100,
+            "mean_insert_ms": statistics.fmean(elapsed) / 1e6,
+        })
+    return summary
+
+
+def run_experiment_grid(formats, table_sizes, rounds, key_counts, hash_functions, workers, seed, json_path=None):
+    """Run the experiment grid and print (and optionally save) the summary"""
+    start = time.perf_counter()
+    summary = run_experiments(formats, table_sizes, rounds, key_counts, hash_functions, workers, seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'Format':>6}{'Size':>9}{'Keys':>11}  {'Hash function':<16}{'Rounds':>7}{'Mean':>11}"
+          f"{'Stdev':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'Rate %':>8}{'Insert ms':>11}")
+    for row in summary:
+        print(f"{row['ic_format']:>6}{row['table_size']:>9}{row['keys']:>11}  {row['hash_function']:<16}"
+              f"{row['rounds']:>7}{row['mean_collisions']:>11.2f}{row['stdev_collisions']:>9.2f}"
+              f"{row['p50_collisions']:>9}{row['p95_collisions']:>9}{row['p99_collisions']:>9}"
+              f"{row['collision_rate']:>8.2f}{row['mean_insert_ms']:>11.2f}")
+    print(f"\nFinished in {elapsed:.2f} s")
+
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"Results written to {json_path}")
+
+
+def stress_concurrent_table(thread_counts=(1, 2, 4, 8, 16, 32), keys_per_thread=20000, stripes=64):
+    """
+    Hammer a ConcurrentICHashTable from several threads at once.
+    Every thread inserts its own distinct ICs and then looks them all up.
+    In a final mixed phase the same number of writer threads insert a second
+    set of ICs while reader threads keep calling contains and get. Each result
+    row reports throughput and checks that no insert was lost, that readers
+    never missed a stored IC or saw a wrong payload, and that the collision
+    counter matches the final chain lengths.
+    """
+    results = []
+    for n_threads in thread_counts:
+        # Distinct keys split evenly between the threads: the first half is
+        # stored up front, the second half during the mixed phase
+        n_keys = n_threads * keys_per_thread
+        keys = list(dict.fromkeys(generate_ic_batch(n_keys * 4, 12)))[:n_keys * 2]
+        slices = [keys[i:n_keys:n_threads] for i in range(n_threads)]
+        late_slices = [keys[n_keys + i::n_threads] for i in range(n_threads)]
+        # A mixing hash spreads the keys over every stripe (folding would put
+        # them all in the first few thousand buckets)
+        table = ConcurrentICHashTable(_next_prime(len(keys)), stripes, hash_function="xxhash")
+        found = [0] * n_threads
+        reads = [0] * n_threads
+        bad_reads = [0] * n_threads
+        writers_done = threading.Event()
+
+        def insert_worker(worker, barrier):
+            barrier.wait()
+            for key in slices[worker]:
+                table.insert(key, 12, payload=key)
+
+        def lookup_worker(worker, barrier):
+            barrier.wait()
+            found[worker] = sum(1 for key in slices[worker] if table.contains(key, 12))
+
+        def late_insert_worker(worker, barrier):
+            barrier.wait()
+            for key in late_slices[worker]:
+                table.insert(key, 12, payload=key)
+
+        def mixed_reader(worker, barrier):
+            barrier.wait()
+            # Stored ICs must stay visible with their payload, and an IC that
+            # is being inserted is either missing or complete
+            while not writers_done.is_set():
+                for key, late_key in zip(slices[worker], late_slices[worker]):
+                    if not table.contains(key, 12) or table.get(key, 12) != key:
+                        bad_reads[worker] += 1
+                    if table.get(late_key, 12) not in (None, late_key):
+                        bad_reads[worker] += 1
+                    reads[worker] += 3
+                    if writers_done.is_set():
+                        break
+
+        def run_phase(timed_fn, background_fn=None):
+            """Run n_threads of timed_fn (and of background_fn alongside it) and time timed_fn"""
+            worker_fns = [fn for fn in (timed_fn, background_fn) if fn is not None]
+            barrier = threading.Barrier(n_threads * len(worker_fns) + 1)
+            groups = [[threading.Thread(target=fn, args=(i, barrier)) for i in range(n_threads)]
+                      for fn in worker_fns]
+            for t in chain.from_iterable(groups):
+                t.start()
+            barrier.wait()
+            start = time.perf_counter()
+            for t in groups[0]:
+                t.join()
+            elapsed = time.perf_counter() - start
+            writers_done.set()
+            for t in chain.from_iterable(groups[1:]):
+                t.join()
+            return elapsed
+
+        timings = [run_phase(insert_worker), run_phase(lookup_worker)]
+        writers_done.clear()
+        timings.append(run_phase(late_insert_worker, mixed_reader))
+
+        # Every IC from both phases has to be stored with its payload
+        unreadable = sum(1 for key in keys if table.get(key, 12) != key)
+        expected_collisions = sum(len(bucket) - 1 for bucket in table.table if bucket)
+        results.append({
+            "threads": n_threads,
+            "keys": len(keys),
+            "inserts_per_sec": n_keys / timings[0],
+            "lookups_per_sec": n_keys / timings[1],
+            "mixed_inserts_per_sec": n_keys / timings[2],
+            "mixed_reads_per_sec": sum(reads) / timings[2],
+            "lost_inserts": len(keys) - len(table) + unreadable,
+            "missing_lookups": n_keys - sum(found),
+            "bad_reads": sum(bad_reads),
+            "collisions_ok": table.collisions == expected_collisions,
+        })
+    return results
+
+
+def run_stress_benchmark(thread_counts=(1, 2, 4, 8, 16, 32), keys_per_thread=20000):
+    """Print the concurrent table stress test results"""
+    print(f"{'Threads':>8}{'Keys':>10}{'Inserts/s':>13}{'Lookups/s':>13}{'Mixed ins/s':>13}{'Mixed reads/s':>15}"
+          f"{'Lost':>6}{'Missing':>9}{'Bad reads':>11}  Collisions")
+    for row in stress_concurrent_table(thread_counts, keys_per_thread):
+        print(f"{row['threads']:>8}{row['keys']:>10}{row['inserts_per_sec']:>13,.0f}{row['lookups_per_sec']:>13,.0f}"
+              f"{row['mixed_inserts_per_sec']:>13,.0f}{row['mixed_reads_per_sec']:>15,.0f}"
+              f"{row['lost_inserts']:>6}{row['missing_lookups']:>9}{row['bad_reads']:>11}"
+              f"  {'ok' if row['collisions_ok'] else 'MISMATCH'}")
+
+
+def parse_args(argv=None):
+    """Command line options; with no command the original experiment runs"""
+    parser = argparse.ArgumentParser(description="Malaysian IC hash table experiments")
+    commands = parser.add_subparsers(dest="command")
+
+    hashes = commands.add_parser("hashes", help="benchmark the registered hash functions")
+    hashes.add_argument("--keys", type=int, default=1000, help="number of ICs to hash")
+    hashes.add_argument("--sizes", type=int, nargs="+", default=[1009, 2003], help="table sizes")
+
+    lookups = commands.add_parser("lookups", help="measure lookup latency percentiles")
+    lookups.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000],
+                         help="number of keys per table (about 200 MB per million)")
+    lookups.add_argument("--queries", type=int, default=100_000, help="lookups per table")
+    lookups.add_argument("--hash", default="xxhash", help="hash function name")
+
+    experiment = commands.add_parser("experiment", help="run the collision experiment over a grid of settings")
+    experiment.add_argument("--formats", type=int, nargs="+", default=[12, 16], choices=[12, 16])
+    experiment.add_argument("--sizes", type=int, nargs="+", default=[1009, 2003], help="table sizes")
+    experiment.add_argument("--rounds", type=int, default=10)
+    experiment.add_argument("--keys", type=int, nargs="+", default=[1000], help="ICs inserted per round")
+    experiment.add_argument("--hashes", nargs="+", default=["folding"], help="hash function names")
+    experiment.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    experiment.add_argument("--seed", type=int, default=0)
+    experiment.add_argument("--json", help="also write the results to this JSON file")
+
+    stress = commands.add_parser("stress", help="stress test the thread-safe table")
+    stress.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    stress.add_argument("--keys", type=int, default=20000, help="ICs inserted per thread")
+
+    return parser.parse_args(argv)
+
+
 def main():
     # Create two hash tables with sizes 1009 and 2003
     table1 = ICHashTable(1009)
@@ -164,19 +1338,14 @@ def main():
     total_collisions_table2_12 = []
 
     for round_num in range(1, 11):
-        # Reset counters for each round
-        table1.collisions = 0
-        table2.collisions = 0
-
-        # Clear tables
-        table1.table = [[] for _ in range(table1.size)]
-        table2.table = [[] for _ in range(table2.size)]
+        # Clear tables and reset counters for each round
+        table1.clear()
+        table2.clear()
 
         # Insert 1000 random 12-digit ICs into both tables
-        for _ in range(1000):
-            ic = generate_random_ic_12()
-            table1.insert(ic, 12)  # Specify 12-digit format
-            table2.insert(ic, 12)
+        ics = generate_ic_batch(1000, 12)
+        table1.insert_many(ics, 12)  # Specify 12-digit format
+        table2.insert_many(ics, 12)
 
         # Record collisions for this round
         total_collisions_table1_12.append(table1.collisions)
@@ -214,19 +1383,14 @@ def main():
     total_collisions_table2_16 = []
 
     for round_num in range(1, 11):
-        # Reset counters for each round
-        table1.collisions = 0
-        table2.collisions = 0
-
-        # Clear tables
-        table1.table = [[] for _ in range(table1.size)]
-        table2.table = [[] for _ in range(table2.size)]
+        # Clear tables and reset counters for each round
+        table1.clear()
+        table2.clear()
 
         # Insert 1000 random 16-digit ICs into both tables
-        for _ in range(1000):
-            ic = generate_random_ic_16()
-            table1.insert(ic, 16)  # Specify 16-digit format
-            table2.insert(ic, 16)
+        ics = generate_ic_batch(1000, 16)
+        table1.insert_many(ics, 16)  # Specify 16-digit format
+        table2.insert_many(ics, 16)
 
         # Record collisions for this round
         total_collisions_table1_16.append(table1.collisions)
@@ -268,4 +1432,15 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.command == "hashes":
+        run_hash_benchmark(args.sizes, args.keys)
+    elif args.command == "lookups":
+        run_lookup_benchmark(args.sizes, args.queries, args.hash)
+    elif args.command == "stress":
+        run_stress_benchmark(args.threads, args.keys)
+    elif args.command == "experiment":
+        run_experiment_grid(args.formats, args.sizes, args.rounds, args.keys, args.hashes,
+                            args.workers, args.seed, args.json)
+    else:
+        main()
\ No newline at end of file
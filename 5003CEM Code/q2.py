@@ -1,3 +1,24 @@
+import argparse
+import asyncio
+import base64
+import csv
+import heapq
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, chain, islice
+from operator import mul, sub
+from types import MappingProxyType
+
+from q3 import percentile
+
 
 class Graph:
     """
@@ -6,13 +27,23 @@ class Graph:
     """
 
     def __init__(self):
-        # Dictionary to store vertices and their outgoing edges
+        # Dictionary to store vertices and their outgoing edges.
+        # Each vertex maps to a dict used as an insertion-ordered set
+        # (neighbour -> None), so edge checks, inserts and deletes are O(1)
         self.adjacency_list = {}
+        # Reverse index: vertex -> vertices with an edge pointing to it
+        self.incoming_adjacency_list = {}
+        # Keyset pagination indexes (vertex -> _EdgeOrder), built per vertex
+        # on its first page request. While a vertex has one, the values of its
+        # neighbour dict are the edges' positions in it instead of None.
+        self._outgoing_order = {}
+        self._incoming_order = {}
 
     def addVertex(self, vertex):
         """Add a new vertex to the graph if it doesn't already exist"""
         if vertex not in self.adjacency_list:
-            self.adjacency_list[vertex] = []
+            self.adjacency_list[vertex] = {}
+            self.incoming_adjacency_list[vertex] = {}
             return True
         return False  # Vertex already exists
 
@@ -26,39 +57,269 @@ class Graph:
 
         # Add edge (avoid duplicates)
         if destination not in self.adjacency_list[source]:
-            self.adjacency_list[source].append(destination)
+            self.adjacency_list[source][destination] = None
+            self.incoming_adjacency_list[destination][source] = None
+            if self._outgoing_order or self._incoming_order:
+                self._indexEdge(source, destination)
             return True
         return False  # Edge already exists
 
+    def addEdges(self, edges):
+        """Add many (source, destination) edges at once, returning how many were new"""
+        adjacency_list = self.adjacency_list
+        incoming_adjacency_list = self.incoming_adjacency_list
+        indexed = bool(self._outgoing_order or self._incoming_order)
+        added = 0
+        for source, destination in edges:
+            outgoing = adjacency_list.get(source)
+            if outgoing is None:
+                self.addVertex(source)
+                outgoing = adjacency_list[source]
+            if destination not in adjacency_list:
+                self.addVertex(destination)
+
+            if destination not in outgoing:
+                outgoing[destination] = None
+                incoming_adjacency_list[destination][source] = None
+                if indexed:
+                    self._indexEdge(source, destination)
+                added += 1
+        return added
+
     def removeEdge(self, source, destination):
         """Remove an edge between source and destination if it exists"""
         if source in self.adjacency_list and destination in self.adjacency_list[source]:
-            self.adjacency_list[source].remove(destination)
+            del self.adjacency_list[source][destination]
+            del self.incoming_adjacency_list[destination][source]
+            if source in self._outgoing_order:
+                self._outgoing_order[source].discard(self.adjacency_list[source])
+            if destination in self._incoming_order:
+                self._incoming_order[destination].discard(self.incoming_adjacency_list[destination])
             return True
         return False  # Edge doesn't exist
 
+    def _indexEdge(self, source, destination):
+        """Give a new edge its position in the pagination indexes of its ends, if they have one"""
+        order = self._outgoing_order.get(source)
+        if order is not None:
+            self.adjacency_list[source][destination] = order.append(destination)
+        order = self._incoming_order.get(destination)
+        if order is not None:
+            self.incoming_adjacency_list[destination][source] = order.append(source)
+
+    def outgoingPage(self, vertex, limit, after=None):
+        """
+        Up to `limit` vertices this vertex has edges to, in the order the edges
+        were added, starting after position `after` (None for the start).
+        Returns (vertices, position to pass as `after` for the next page, or
+        None if there are no more). Costs O(limit), however deep the page.
+        """
+        return self._page(self._outgoing_order, self.adjacency_list[vertex], vertex, limit, after)
+
+    def incomingPage(self, vertex, limit, after=None):
+        """Like outgoingPage, for the vertices with edges coming into this vertex"""
+        return self._page(self._incoming_order, self.incoming_adjacency_list[vertex], vertex, limit, after)
+
+    def _page(self, orders, neighbours, vertex, limit, after):
+        order = orders.get(vertex)
+        if order is None:
+            order = orders[vertex] = _EdgeOrder(neighbours)
+        return order.page(neighbours, limit, after)
+
     def listOutgoingAdjacencyVertex(self, vertex):
         """For a given vertex, list all vertices where edges are outgoing from this vertex"""
         if vertex in self.adjacency_list:
-            return self.adjacency_list[vertex]
+            return list(self.adjacency_list[vertex])
         return []  # Vertex doesn't exist
 
+    def listIncomingAdjacencyVertex(self, vertex):
+        """For a given vertex, list all vertices with edges coming into this vertex"""
+        if vertex in self.incoming_adjacency_list:
+            return list(self.incoming_adjacency_list[vertex])
+        return []  # Vertex doesn't exist
+
+    def hasEdge(self, source, destination):
+        """Check whether there is a directed edge from source to destination"""
+        return source in self.adjacency_list and destination in self.adjacency_list[source]
+
     def getAllVertices(self):
         """Return all vertices in the graph"""
         return list(self.adjacency_list.keys())
 
 
+class _EdgeOrder:
+    """
+    Append-only record of the order one vertex's neighbours were added in,
+    for keyset pagination. Every edge gets an increasing position, stored
+    both here and as its value in the neighbour dict. Removed edges stay
+    here until they outnumber the live ones, and are recognised because the
+    dict no longer maps the neighbour to that position. Positions never
+    change, so a page boundary stays valid across follows and unfollows.
+    """
+
+    __slots__ = ("positions", "vertices", "next_position", "dead")
+
+    def __init__(self, neighbours):
+        self.vertices = list(neighbours)
+        self.positions = array("q", range(len(self.vertices)))
+        for position, vertex in enumerate(self.vertices):
+            neighbours[vertex] = position
+        self.next_position = len(self.vertices)
+        self.dead = 0
+
+    def append(self, vertex):
+        """Record a new neighbour and return its position"""
+        position = self.next_position
+        self.next_position += 1
+        self.positions.append(position)
+        self.vertices.append(vertex)
+        return position
+
+    def discard(self, neighbours):
+        """Note that an edge was removed, compacting once most entries are dead"""
+        self.dead += 1
+        if self.dead > len(neighbours):
+            # The dict holds the live edges in position order
+            self.vertices = list(neighbours)
+            self.positions = array("q", neighbours.values())
+            self.dead = 0
+
+    def page(self, neighbours, limit, after):
+        positions = self.positions
+        vertices = self.vertices
+        i = 0 if after is None else bisect_right(positions, after)
+        end = len(positions)
+        page = []
+        while i < end:
+            # Skip entries for removed (or since re-added) edges
+            if neighbours.get(vertices[i]) == positions[i]:
+                if len(page) == limit:
+                    return page, positions[i - 1]
+                page.append(vertices[i])
+            i += 1
+        return page, None
+
+
+class GraphSnapshot:
+    """
+    Frozen, read-optimised copy of a Graph in compressed sparse row form.
+    Vertices are numbered 0..n-1 in insertion order. The neighbours of vertex i
+    are targets[offsets[i]:offsets[i + 1]], held in compact integer arrays for
+    both edge directions. It offers the same query methods as Graph, plus
+    id-based accessors for analytics.
+    """
+
+    def __init__(self, graph):
+        self.vertices = graph.getAllVertices()
+        self.vertex_ids = {vertex: i for i, vertex in enumerate(self.vertices)}
+        self.out_offsets, self.out_targets = self._build_csr(graph.adjacency_list)
+        self.in_offsets, self.in_sources = self._build_csr(graph.incoming_adjacency_list)
+
+    def _build_csr(self, adjacency):
+        """Flatten {vertex: neighbours} into (offsets, neighbour ids) arrays"""
+        neighbour_sets = [adjacency[vertex] for vertex in self.vertices]
+        offsets = array("q", [0])
+        offsets.extend(accumulate(map(len, neighbour_sets)))
+        neighbours = array("i", map(self.vertex_ids.__getitem__, chain.from_iterable(neighbour_sets)))
+        return offsets, neighbours
+
+    def vertexCount(self):
+        """Number of vertices in the snapshot"""
+        return len(self.vertices)
+
+    def edgeCount(self):
+        """Number of directed edges in the snapshot"""
+        return len(self.out_targets)
+
+    def outgoingIds(self, vertex_id):
+        """Ids of the vertices an id points to"""
+        return self.out_targets[self.out_offsets[vertex_id]:self.out_offsets[vertex_id + 1]]
+
+    def incomingIds(self, vertex_id):
+        """Ids of the vertices pointing to an id"""
+        return self.in_sources[self.in_offsets[vertex_id]:self.in_offsets[vertex_id + 1]]
+
+    def outDegree(self, vertex_id):
+        return self.out_offsets[vertex_id + 1] - self.out_offsets[vertex_id]
+
+    def inDegree(self, vertex_id):
+        return self.in_offsets[vertex_id + 1] - self.in_offsets[vertex_id]
+
+    def listOutgoingAdjacencyVertex(self, vertex):
+        """For a given vertex, list all vertices where edges are outgoing from this vertex"""
+        if vertex in self.vertex_ids:
+            return [self.vertices[i] for i in self.outgoingIds(self.vertex_ids[vertex])]
+        return []  # Vertex doesn't exist
+
+    def listIncomingAdjacencyVertex(self, vertex):
+        """For a given vertex, list all vertices with edges coming into this vertex"""
+        if vertex in self.vertex_ids:
+            return [self.vertices[i] for i in self.incomingIds(self.vertex_ids[vertex])]
+        return []  # Vertex doesn't exist
+
+    def hasEdge(self, source, destination):
+        """Check whether there is a directed edge from source to destination"""
+        if source in self.vertex_ids and destination in self.vertex_ids:
+            return self.vertex_ids[destination] in self.outgoingIds(self.vertex_ids[source])
+        return False
+
+    def getAllVertices(self):
+        """Return all vertices in the snapshot"""
+        return list(self.vertices)
+
+
 class Person:
     """
     Represents a single user of a social media app.
     Contains relevant attributes for a user profile.
+    Uses __slots__ instead of a per-instance __dict__, and caches the profile
+    view until one of the fields changes.
     """
 
+    __slots__ = ("_name", "_gender", "_biography", "_is_private", "_profile")
+
     def __init__(self, name, gender=None, biography=None, is_private=False):
-        self.name = name
-        self.gender = gender
-        self.biography = biography
-        self.is_private = is_private  # Privacy setting (public/private profile)
+        self._name = name
+        self._gender = gender
+        self._biography = biography
+        self._is_private = is_private  # Privacy setting (public/private profile)
+        self._profile = None  # Cached result of get_profile_info
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        self._name = value
+        self._profile = None
+
+    @property
+    def gender(self):
+        return self._gender
+
+    @gender.setter
+    def gender(self, value):
+        self._gender = value
+        self._profile = None
+
+    @property
+    def biography(self):
+        return self._biography
+
+    @biography.setter
+    def biography(self, value):
+        self._biography = value
+        self._profile = None
+
+    @property
+    def is_private(self):
+        return self._is_private
+
+    @is_private.setter
+    def is_private(self, value):
+        self._is_private = value
+        self._profile = None
 
     def __str__(self):
         """String representation of a Person"""
@@ -69,19 +330,22 @@ class Person:
         return f"Person('{self.name}')"
 
     def get_profile_info(self):
-        """Return profile information based on privacy settings"""
-        if self.is_private:
-            return {
-                "name": self.name,
-                "privacy": "Private"
-            }
-        else:
-            return {
-                "name": self.name,
-                "gender": self.gender,
-                "biography": self.biography,
-                "privacy": "Public"
-            }
+        """Return profile information based on privacy settings (read-only view)"""
+        if self._profile is None:
+            if self._is_private:
+                profile = {
+                    "name": self._name,
+                    "privacy": "Private"
+                }
+            else:
+                profile = {
+                    "name": self._name,
+                    "gender": self._gender,
+                    "biography": self._biography,
+                    "privacy": "Public"
+                }
+            self._profile = MappingProxyType(profile)
+        return self._profile
 
 
 class SocialMediaApp:
@@ -129,13 +393,225 @@ class SocialMediaApp:
         """Get list of accounts that follow a person"""
         if person_name in self.people:
             target = self.people[person_name]
-            followers = []
-            for person in self.graph.getAllVertices():
-                if target in self.graph.listOutgoingAdjacencyVertex(person):
-                    followers.append(person)
-            return followers
+            return self.graph.listIncomingAdjacencyVertex(target)
+        return None  # User not found
+
+    def get_followed_accounts_page(self, person_name, limit=50, cursor=None):
+        """
+        One page of the accounts a person follows, as (people, next_cursor).
+        Pass next_cursor back to get the following page; it is None on the
+        last page. Returns None if the user is not found.
+        """
+        if person_name in self.people:
+            return _page(self.graph.outgoingPage, self.people[person_name], limit, cursor)
+        return None  # User not found
+
+    def get_followers_page(self, person_name, limit=50, cursor=None):
+        """One page of a person's followers, as (people, next_cursor); see get_followed_accounts_page"""
+        if person_name in self.people:
+            return _page(self.graph.incomingPage, self.people[person_name], limit, cursor)
         return None  # User not found
 
+    def iter_followed_accounts(self, person_name, page_size=50):
+        """Yield the accounts a person follows page by page"""
+        return _iter_pages(self.get_followed_accounts_page, person_name, page_size)
+
+    def iter_followers(self, person_name, page_size=50):
+        """Yield a person's followers page by page"""
+        return _iter_pages(self.get_followers_page, person_name, page_size)
+
+    def get_shortest_path(self, source_name, target_name, max_depth=None):
+        """
+        Shortest chain of follows from one person to another, as a list of
+        people including both ends. Runs a BFS from each end (following edges
+        forwards from the source and backwards from the target) and stops as
+        soon as they meet or the path would exceed max_depth follows.
+        Returns [] if there is no such path and None if a user is not found.
+        """
+        if source_name not in self.people or target_name not in self.people:
+            return None  # User not found
+        source = self.people[source_name]
+        target = self.people[target_name]
+        if source is target:
+            return [source]
+
+        outgoing = self.graph.adjacency_list
+        incoming = self.graph.incoming_adjacency_list
+        # Per side: vertex -> (parent, distance from that side's start)
+        forward = {source: (None, 0)}
+        backward = {target: (None, 0)}
+        forward_frontier = [source]
+        backward_frontier = [target]
+        depth = 0
+
+        while forward_frontier and backward_frontier:
+            if max_depth is not None and depth >= max_depth:
+                break
+            depth += 1
+
+            # Expand the smaller frontier by one full level
+            if len(forward_frontier) <= len(backward_frontier):
+                visited, other, neighbours = forward, backward, outgoing
+                frontier, forward_frontier = forward_frontier, []
+                next_frontier = forward_frontier
+            else:
+                visited, other, neighbours = backward, forward, incoming
+                frontier, backward_frontier = backward_frontier, []
+                next_frontier = backward_frontier
+
+            best = None
+            for vertex in frontier:
+                distance = visited[vertex][1] + 1
+                for neighbour in neighbours[vertex]:
+                    if neighbour in visited:
+                        continue
+                    visited[neighbour] = (vertex, distance)
+                    next_frontier.append(neighbour)
+                    if neighbour in other:
+                        length = distance + other[neighbour][1]
+                        if best is None or length < best[0]:
+                            best = (length, neighbour)
+
+            if best is not None:
+                meeting = best[1]
+                path = []
+                vertex = meeting
+                while vertex is not None:
+                    path.append(vertex)
+                    vertex = forward[vertex][0]
+                path.reverse()
+                vertex = backward[meeting][0]
+                while vertex is not None:
+                    path.append(vertex)
+                    vertex = backward[vertex][0]
+                return path
+        return []  # Not connected within max_depth
+
+    def get_k_hop_neighbours(self, person_name, k=2, limit=None):
+        """
+        People reachable within k follows, mapped to their distance in hops.
+        The search stops early once `limit` people have been found.
+        """
+        if person_name not in self.people:
+            return None  # User not found
+        start = self.people[person_name]
+        outgoing = self.graph.adjacency_list
+
+        distances = {}
+        seen = {start}
+        frontier = [start]
+        for hops in range(1, k + 1):
+            next_frontier = []
+            for vertex in frontier:
+                for neighbour in outgoing[vertex]:
+                    if neighbour in seen:
+                        continue
+                    seen.add(neighbour)
+                    distances[neighbour] = hops
+                    if limit is not None and len(distances) >= limit:
+                        return distances
+                    next_frontier.append(neighbour)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return distances
+
+    def get_mutual_followers(self, name_a, name_b):
+        """People who follow both users"""
+        if name_a not in self.people or name_b not in self.people:
+            return None  # User not found
+        followers_a = self.graph.incoming_adjacency_list[self.people[name_a]]
+        followers_b = self.graph.incoming_adjacency_list[self.people[name_b]]
+        # Walk the smaller follower set and probe the larger one
+        if len(followers_b) < len(followers_a):
+            followers_a, followers_b = followers_b, followers_a
+        return [person for person in followers_a if person in followers_b]
+
+    def is_mutual_follow(self, name_a, name_b):
+        """Check whether two users follow each other"""
+        if name_a not in self.people or name_b not in self.people:
+            return False
+        person_a = self.people[name_a]
+        person_b = self.people[name_b]
+        return self.graph.hasEdge(person_a, person_b) and self.graph.hasEdge(person_b, person_a)
+
+    def get_friends_of_friends(self, person_name, limit=10):
+        """
+        "People you may know": accounts followed by the accounts this person
+        follows, ranked by how many of them follow each one. Returns up to
+        `limit` (person, overlap count) pairs; people already followed and the
+        person themselves are left out.
+        """
+        if person_name not in self.people:
+            return None  # User not found
+        person = self.people[person_name]
+        outgoing = self.graph.adjacency_list
+        followed = outgoing[person]
+
+        overlap = Counter()
+        for friend in followed:
+            overlap.update(outgoing[friend].keys())
+        overlap.pop(person, None)
+        for friend in followed:
+            overlap.pop(friend, None)
+        return overlap.most_common(limit)
+
+    def load_people(self, source, delimiter=",", has_header=False):
+        """
+        Add people from a CSV file (path, open file or iterable of lines).
+        Columns are name, gender, biography, is_private; all but the name are
+        optional. Rows are streamed, so the file is never held in memory.
+        Returns the number of people added.
+        """
+        people = self.people
+        add_vertex = self.graph.addVertex
+        added = 0
+        for row in _read_rows(source, delimiter, has_header):
+            name = row[0]
+            if name in people:
+                continue
+            gender, biography, is_private = (row[1:4] + [""] * 3)[:3]
+            person = Person(name, gender or None, biography or None,
+                            is_private.strip().lower() in ("yes", "true", "1"))
+            people[name] = person
+            add_vertex(person)
+            added += 1
+        return added
+
+    def load_follows(self, source, delimiter=",", has_header=False, batch_size=10000):
+        """
+        Add follows from an edge file with one "follower,target" pair per line.
+        Rows are streamed in batches into Graph.addEdges; rows naming unknown
+        users are skipped. Returns the number of new follows.
+        """
+        people = self.people
+
+        def edges():
+            for row in _read_rows(source, delimiter, has_header):
+                follower = people.get(row[0])
+                target = people.get(row[1]) if len(row) > 1 else None
+                if follower is not None and target is not None:
+                    yield follower, target
+
+        added = 0
+        edge_stream = edges()
+        while True:
+            batch = list(islice(edge_stream, batch_size))
+            if not batch:
+                return added
+            added += self.graph.addEdges(batch)
+
+    def snapshot(self):
+        """Take a frozen GraphSnapshot of the follow graph for read-heavy analytics"""
+        return GraphSnapshot(self.graph)
+
+    def get_influence_scores(self, limit=10, workers=1):
+        """The `limit` most influential users by PageRank, as (person, score) pairs"""
+        snapshot = self.snapshot()
+        ranks = pagerank(snapshot, workers=workers)
+        top = heapq.nlargest(limit, range(len(ranks)), key=ranks.__getitem__)
+        return [(snapshot.vertices[i], ranks[i]) for i in top]
+
     def get_all_users(self):
         """Get list of all users in the app"""
         return list(self.people.values())
@@ -147,8 +623,663 @@ class SocialMediaApp:
         return None
 
 
-def run_social_media_app():
-    """Run the social media app with a menu-driven interface"""
+def _encode_cursor(position):
+    """Opaque page cursor for the last edge position a page returned"""
+    return base64.urlsafe_b64encode(f"k:{position}".encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        prefix, position = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        if prefix == "k" and int(position) >= 0:
+            return int(position)
+    except (ValueError, UnicodeError):
+        pass
+    raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+def _page(graph_page, vertex, limit, cursor):
+    """
+    One page from Graph.outgoingPage / incomingPage with an opaque cursor.
+    Only the page itself is copied, each page costs O(limit), and follows
+    or unfollows between requests never make a listing skip or repeat
+    someone who stayed (new follows show up at the end).
+    """
+    if limit < 1:
+        raise ValueError(f"limit must be at least 1, got {limit}")
+    after = _decode_cursor(cursor) if cursor else None
+    page, last = graph_page(vertex, limit, after)
+    return page, _encode_cursor(last) if last is not None else None
+
+
+def _iter_pages(fetch_page, person_name, page_size):
+    """Generator over the pages returned by a get_*_page method"""
+    cursor = None
+    while True:
+        result = fetch_page(person_name, page_size, cursor)
+        if result is None:
+            return  # User not found
+        page, cursor = result
+        if page:
+            yield page
+        if cursor is None:
+            return
+
+
+class PersistentSocialMediaApp(SocialMediaApp):
+    """
+    SocialMediaApp that survives restarts.
+    Every successful add/follow/unfollow is appended to a write-ahead log
+    (one JSON line per operation, numbered by sequence). Every snapshot_every
+    operations the whole state is compacted into a snapshot (people as JSON,
+    follows as a packed array of integer id pairs) and the log is emptied.
+    On start-up the latest snapshot is loaded and only the log entries
+    written after it are replayed.
+    """
+
+    def __init__(self, directory, snapshot_every=100000, sync=False):
+        super().__init__()
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.sync = sync  # fsync after every logged operation
+        self._seq = 0  # Sequence number of the last applied operation
+        self._generation = 0  # Number of the latest snapshot; every compaction gets a new one
+        self._ops_since_snapshot = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._wal_path = os.path.join(directory, "wal.log")
+        self._snapshot_path = os.path.join(directory, "snapshot.json")
+        self._recover()
+        self._wal = open(self._wal_path, "a", encoding="utf-8")
+
+    def add_person(self, person):
+        if super().add_person(person):
+            self._log("add", person.name, person.gender, person.biography, person.is_private)
+            return True
+        return False
+
+    def follow_person(self, follower_name, target_name):
+        if super().follow_person(follower_name, target_name):
+            self._log("follow", follower_name, target_name)
+            return True
+        return False
+
+    def unfollow_person(self, follower_name, target_name):
+        if super().unfollow_person(follower_name, target_name):
+            self._log("unfollow", follower_name, target_name)
+            return True
+        return False
+
+    def load_people(self, source, delimiter=",", has_header=False):
+        # Bulk loads skip the log and are made durable by a snapshot instead
+        added = super().load_people(source, delimiter, has_header)
+        self.compact()
+        return added
+
+    def load_follows(self, source, delimiter=",", has_header=False, batch_size=10000):
+        added = super().load_follows(source, delimiter, has_header, batch_size)
+        self.compact()
+        return added
+
+    def _log(self, *operation):
+        """Append one applied operation to the write-ahead log"""
+        self._seq += 1
+        self._wal.write(json.dumps([self._seq, *operation]) + "\n")
+        self._wal.flush()
+        if self.sync:
+            os.fsync(self._wal.fileno())
+
+        self._ops_since_snapshot += 1
+        if self._ops_since_snapshot >= self.snapshot_every:
+            self.compact()
+
+    def compact(self):
+        """Write a snapshot of the current state and empty the log"""
+        people = list(self.people.values())
+        ids = {person: i for i, person in enumerate(people)}
+        edges = array("i")
+        adjacency_list = self.graph.adjacency_list
+        for person in people:
+            source_id = ids[person]
+            for target in adjacency_list[person]:
+                edges.append(source_id)
+                edges.append(ids[target])
+
+        # Each compaction writes a new generation of edge file (never the one
+        # the current snapshot.json references), and the JSON file is
+        # replaced last, so a crash at any point leaves the previous snapshot
+        # intact. Bulk loads compact without logging, so seq cannot be used.
+        generation = self._generation + 1
+        edges_name = f"snapshot-{generation}.edges"
+        edges_path = os.path.join(self.directory, edges_name)
+        with open(edges_path + ".tmp", "wb") as f:
+            edges.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(edges_path + ".tmp", edges_path)
+
+        temp_path = self._snapshot_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "seq": self._seq,
+                "generation": generation,
+                "edges": edges_name,
+                "people": [[p.name, p.gender, p.biography, p.is_private] for p in people],
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self._snapshot_path)
+        _fsync_directory(self.directory)
+        self._generation = generation
+
+        # Older edge files (and leftovers of interrupted compactions) are no
+        # longer referenced
+        for name in os.listdir(self.directory):
+            if name.startswith("snapshot-") and ".edges" in name and name != edges_name:
+                os.remove(os.path.join(self.directory, name))
+
+        # Everything in the log is now covered by the snapshot
+        if hasattr(self, "_wal"):
+            self._wal.close()
+        self._wal = open(self._wal_path, "w", encoding="utf-8")
+        self._ops_since_snapshot = 0
+
+    def _recover(self):
+        """Load the latest snapshot, then replay the log entries written after it"""
+        if os.path.exists(self._snapshot_path):
+            with open(self._snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            people = [Person(*fields) for fields in snapshot["people"]]
+            for person in people:
+                SocialMediaApp.add_person(self, person)
+
+            edges = array("i")
+            edges_path = os.path.join(self.directory, snapshot["edges"])
+            with open(edges_path, "rb") as f:
+                edges.frombytes(f.read())
+            self.graph.addEdges(zip(map(people.__getitem__, edges[0::2]),
+                                    map(people.__getitem__, edges[1::2])))
+            self._seq = snapshot["seq"]
+            # Snapshots written before generations existed named edge files by seq
+            self._generation = snapshot.get("generation", snapshot["seq"])
+
+        if not os.path.exists(self._wal_path):
+            return
+        with open(self._wal_path, "r+b") as f:
+            position = 0
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete line")
+                    seq, op, *args = json.loads(line)
+                except ValueError:
+                    # Torn final write from a crash; cut it off so new
+                    # entries are not appended to a broken line
+                    f.truncate(position)
+                    break
+                position += len(line)
+                if seq <= self._seq:
+                    continue  # Already in the snapshot
+                if op == "add":
+                    SocialMediaApp.add_person(self, Person(*args))
+                elif op == "follow":
+                    SocialMediaApp.follow_person(self, *args)
+                elif op == "unfollow":
+                    SocialMediaApp.unfollow_person(self, *args)
+                self._seq = seq
+                self._ops_since_snapshot += 1
+
+    def close(self):
+        """Flush and close the write-ahead log"""
+        self._wal.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _fsync_directory(directory):
+    """Make renames inside a directory durable (directories cannot be fsynced on Windows)"""
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _read_rows(source, delimiter=",", has_header=False):
+    """
+    Stream CSV rows from a path, an open file or an iterable of lines.
+    Blank lines and lines starting with '#' are skipped.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, newline="", encoding="utf-8") as f:
+            yield from _read_rows(f, delimiter, has_header)
+        return
+
+    lines = (line for line in source if line.strip() and not line.startswith("#"))
+    rows = csv.reader(lines, delimiter=delimiter)
+    if has_header:
+        next(rows, None)
+    for row in rows:
+        yield [field.strip() for field in row]
+
+
+# CSR in-edge arrays shared with PageRank worker processes
+_pagerank_in_offsets = None
+_pagerank_in_sources = None
+
+
+def _init_pagerank_worker(in_offsets, in_sources):
+    """Receive the in-edge arrays once per worker instead of once per iteration"""
+    global _pagerank_in_offsets, _pagerank_in_sources
+    _pagerank_in_offsets = in_offsets
+    _pagerank_in_sources = in_sources
+
+
+def _pagerank_pull(in_offsets, in_sources, contributions, first, last, base, damping):
+    """New ranks for vertices first..last-1: each pulls the contributions of its in-neighbours"""
+    gather = contributions.__getitem__
+    return array("d", [base + damping * sum(map(gather, in_sources[start:end]))
+                       for start, end in zip(in_offsets[first:last], in_offsets[first + 1:last + 1])])
+
+
+def _pagerank_chunk(first, last, contributions, base, damping):
+    return _pagerank_pull(_pagerank_in_offsets, _pagerank_in_sources, contributions, first, last, base, damping)
+
+
+def pagerank(snapshot, damping=0.85, tolerance=1e-6, max_iterations=100, workers=1):
+    """
+    PageRank of every vertex in a GraphSnapshot, indexed by vertex id.
+    Uses power iteration over the CSR in-edge arrays. Each iteration is
+    a per-vertex sum over a slice of in_sources, so the inner loop runs in C.
+    Rank held by accounts that follow nobody is spread evenly. Iteration stops
+    when the L1 change drops below tolerance or after max_iterations. With
+    workers > 1 the vertices are split into ranges with similar in-edge counts
+    and each iteration is shared across a process pool.
+    """
+    n = snapshot.vertexCount()
+    if n == 0:
+        return array("d")
+    in_offsets = snapshot.in_offsets
+    in_sources = snapshot.in_sources
+    out_degrees = [end - start for start, end in zip(snapshot.out_offsets, snapshot.out_offsets[1:])]
+    dangling = [i for i, degree in enumerate(out_degrees) if degree == 0]
+    inverse_degrees = [1 / degree if degree else 0.0 for degree in out_degrees]
+
+    pool = None
+    if workers > 1:
+        # Split the vertices so every worker pulls about the same number of edges
+        edges = len(in_sources)
+        bounds = [0] + [bisect_left(in_offsets, edges * i // workers, 0, n) for i in range(1, workers)] + [n]
+        ranges = [(first, last) for first, last in zip(bounds, bounds[1:]) if first < last]
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_pagerank_worker,
+                                   initargs=(in_offsets, in_sources))
+
+    ranks = array("d", [1 / n]) * n
+    try:
+        for _ in range(max_iterations):
+            contributions = array("d", map(mul, ranks, inverse_degrees))
+            dangling_rank = sum(map(ranks.__getitem__, dangling))
+            base = (1 - damping) / n + damping * dangling_rank / n
+
+            if pool is None:
+                new_ranks = _pagerank_pull(in_offsets, in_sources, contributions, 0, n, base, damping)
+            else:
+                futures = [pool.submit(_pagerank_chunk, first, last, contributions, base, damping)
+                           for first, last in ranges]
+                new_ranks = array("d")
+                for future in futures:
+                    new_ranks.extend(future.result())
+
+            change = sum(map(abs, map(sub, new_ranks, ranks)))
+            ranks = new_ranks
+            if change < tolerance:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return ranks
+
+
+def in_degree_centrality(snapshot):
+    """Share of the other vertices that point at each vertex, indexed by vertex id"""
+    n = snapshot.vertexCount()
+    scale = 1 / (n - 1) if n > 1 else 0.0
+    offsets = snapshot.in_offsets
+    return array("d", [(end - start) * scale for start, end in zip(offsets, offsets[1:])])
+
+
+def build_random_app(n_people, avg_following=10, seed=0):
+    """Create an app with n_people users, each following about avg_following random others"""
+    rng = random.Random(seed)
+    app = SocialMediaApp()
+    names = [f"user{i}" for i in range(n_people)]
+    for name in names:
+        app.add_person(Person(name))
+    for name in names:
+        for target in rng.sample(names, min(avg_following, n_people)):
+            if target != name:
+                app.follow_person(name, target)
+    return app
+
+
+def _get_followers_by_scan(app, person_name):
+    """The original get_followers: scan every vertex's outgoing list"""
+    target = app.people[person_name]
+    followers = []
+    for person in app.graph.getAllVertices():
+        if target in app.graph.listOutgoingAdjacencyVertex(person):
+            followers.append(person)
+    return followers
+
+
+def benchmark_get_followers(sizes=(1000, 10000, 100000), avg_following=10, queries=20, seed=0):
+    """
+    Time follower lookups through a full graph scan versus the incoming index.
+    Returns the mean time per lookup in microseconds for each graph size.
+    """
+    rng = random.Random(seed)
+    results = []
+    for n_people in sizes:
+        app = build_random_app(n_people, avg_following, seed)
+        names = rng.sample(list(app.people), min(queries, n_people))
+
+        timings = {}
+        for label, lookup in (("scan", _get_followers_by_scan), ("index", SocialMediaApp.get_followers)):
+            start = time.perf_counter_ns()
+            for name in names:
+                lookup(app, name)
+            timings[label] = (time.perf_counter_ns() - start) / len(names) / 1000
+
+        results.append({
+            "people": n_people,
+            "edges": sum(map(len, app.graph.adjacency_list.values())),
+            "scan_us": timings["scan"],
+            "index_us": timings["index"],
+            "speedup": timings["scan"] / timings["index"],
+        })
+    return results
+
+
+def run_followers_benchmark(sizes=(1000, 10000, 100000), avg_following=10):
+    """Print the follower lookup benchmark"""
+    print(f"{'People':>10}{'Edges':>12}{'Scan (us)':>14}{'Index (us)':>13}{'Speedup':>11}")
+    for row in benchmark_get_followers(sizes, avg_following):
+        print(f"{row['people']:>10,}{row['edges']:>12,}{row['scan_us']:>14,.1f}"
+              f"{row['index_us']:>13,.2f}{row['speedup']:>10,.0f}x")
+
+
+def run_pagerank_benchmark(n_people=100000, avg_following=10, workers=1):
+    """Time PageRank on a random follow graph and show the top accounts"""
+    app = build_random_app(n_people, avg_following)
+    snapshot = app.snapshot()
+    print(f"Graph: {snapshot.vertexCount():,} people, {snapshot.edgeCount():,} follows")
+
+    start = time.perf_counter()
+    ranks = pagerank(snapshot, workers=workers)
+    print(f"PageRank with {workers} worker(s): {time.perf_counter() - start:.2f} s")
+
+    centrality = in_degree_centrality(snapshot)
+    print(f"\n{'Person':<16}{'PageRank':>12}{'In-degree centrality':>24}")
+    for i in heapq.nlargest(10, range(len(ranks)), key=ranks.__getitem__):
+        print(f"{snapshot.vertices[i].name:<16}{ranks[i]:>12.6f}{centrality[i]:>24.6f}")
+
+
+class _DictPerson:
+    """The original Person layout (instance __dict__, new profile dict per call), for comparison"""
+
+    def __init__(self, name, gender=None, biography=None, is_private=False):
+        self.name = name
+        self.gender = gender
+        self.biography = biography
+        self.is_private = is_private
+
+    def get_profile_info(self):
+        if self.is_private:
+            return {"name": self.name, "privacy": "Private"}
+        return {"name": self.name, "gender": self.gender, "biography": self.biography, "privacy": "Public"}
+
+
+def benchmark_person_memory(count=100000, views=10):
+    """
+    Use tracemalloc to compare the original Person layout with the slotted one.
+    Reports bytes per user and bytes allocated per profile view (the views
+    are kept alive, so every fresh dict is counted).
+    """
+    names = [f"user{i}" for i in range(count)]
+    results = []
+    for label, person_class in (("dict", _DictPerson), ("slots", Person)):
+        tracemalloc.start()
+        people = [person_class(name, "Female", "Photographer", False) for name in names]
+        per_user = tracemalloc.get_traced_memory()[0] / count
+
+        before = tracemalloc.get_traced_memory()[0]
+        profiles = [person.get_profile_info() for _ in range(views) for person in people]
+        per_view = (tracemalloc.get_traced_memory()[0] - before - sys.getsizeof(profiles)) / len(profiles)
+        tracemalloc.stop()
+
+        results.append({"layout": label, "bytes_per_user": per_user, "bytes_per_profile_view": per_view})
+        del people, profiles
+    return results
+
+
+def run_memory_benchmark(count=100000):
+    """Print bytes per user and per profile view for both Person layouts"""
+    print(f"{'Layout':<8}{'Bytes/user':>12}{'Bytes/profile view':>20}")
+    for row in benchmark_person_memory(count):
+        print(f"{row['layout']:<8}{row['bytes_per_user']:>12.1f}{row['bytes_per_profile_view']:>20.1f}")
+
+
+class SocialMediaServer:
+    """
+    asyncio front end serving the menu operations over a JSON-lines protocol.
+    Each request is one JSON object per line, e.g.
+        {"op": "follow", "follower": "Eric Ho", "target": "Vennis"}
+    and is answered with {"ok": true, "result": ...} or {"ok": false, "error": ...}.
+    Operations: users, profile, followed, followers (take "name"), follow and
+    unfollow (take "follower" and "target"). followed and followers return
+    one page plus "next_cursor" when "limit" (and optionally "cursor") is
+    given. Every request runs to completion on the event loop thread, so
+    writes are applied one at a time and readers never see a half-applied
+    change to the Graph.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.requests_served = 0
+
+    def handle_request(self, request):
+        """Run one decoded request against the app and build the response"""
+        op = request.get("op")
+        app = self.app
+
+        if op == "users":
+            return {"ok": True, "result": [person.name for person in app.get_all_users()]}
+        if op == "profile":
+            profile = app.get_user_profile(request.get("name"))
+            if profile is None:
+                return {"ok": False, "error": "user not found"}
+            return {"ok": True, "result": dict(profile)}
+        if op in ("followed", "followers"):
+            if "limit" in request:
+                lookup = app.get_followed_accounts_page if op == "followed" else app.get_followers_page
+                try:
+                    page = lookup(request.get("name"), int(request["limit"]), request.get("cursor"))
+                except (TypeError, ValueError) as e:
+                    return {"ok": False, "error": str(e)}
+                if page is None:
+                    return {"ok": False, "error": "user not found"}
+                people, next_cursor = page
+                return {"ok": True, "result": [person.name for person in people], "next_cursor": next_cursor}
+
+            lookup = app.get_followed_accounts if op == "followed" else app.get_followers
+            people = lookup(request.get("name"))
+            if people is None:
+                return {"ok": False, "error": "user not found"}
+            return {"ok": True, "result": [person.name for person in people]}
+        if op in ("follow", "unfollow"):
+            change = app.follow_person if op == "follow" else app.unfollow_person
+            return {"ok": True, "result": change(request.get("follower"), request.get("target"))}
+        return {"ok": False, "error": f"unknown op: {op!r}"}
+
+    async def read_request(self, reader):
+        """
+        Read one request line; b"" at end of stream and None for a line
+        longer than the reader's limit, which is skipped up to its newline
+        """
+        try:
+            return await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            return e.partial
+        except asyncio.LimitOverrunError as e:
+            discard = e.consumed
+        while True:
+            await reader.readexactly(discard)
+            try:
+                await reader.readuntil(b"\n")
+                return None
+            except asyncio.LimitOverrunError as e:
+                discard = e.consumed
+
+    async def handle_client(self, reader, writer):
+        """Serve requests from one connection until it closes"""
+        try:
+            while True:
+                line = await self.read_request(reader)
+                if line is None:
+                    response = {"ok": False, "error": "request too long"}
+                elif not line:
+                    break
+                else:
+                    try:
+                        response = self.handle_request(json.loads(line))
+                    except (ValueError, AttributeError, TypeError):
+                        # Bad JSON, a non-object, or a field of the wrong type
+                        # (e.g. a list as a name, which cannot be looked up)
+                        response = {"ok": False, "error": "invalid request"}
+                self.requests_served += 1
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Start listening and return the asyncio server"""
+        return await asyncio.start_server(self.handle_client, host, port, backlog=4096)
+
+
+async def serve(app, host="127.0.0.1", port=8765):
+    """Serve an app until cancelled"""
+    server = await SocialMediaServer(app).start(host, port)
+    print(f"Serving on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+async def run_load_test(host="127.0.0.1", port=8765, clients=1000, requests_per_client=20,
+                        write_ratio=0.2, seed=0):
+    """
+    Open `clients` concurrent connections and send a mix of reads and writes.
+    Returns throughput and latency percentiles (in microseconds).
+    """
+    # Learn the user names first (one long line for big graphs)
+    reader, writer = await asyncio.open_connection(host, port, limit=2 ** 26)
+    writer.write(b'{"op": "users"}\n')
+    await writer.drain()
+    names = json.loads(await reader.readline())["result"]
+    writer.close()
+
+    rng = random.Random(seed)
+    latencies = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port, limit=2 ** 26)
+        try:
+            for _ in range(requests_per_client):
+                if rng.random() < write_ratio:
+                    request = {"op": rng.choice(("follow", "unfollow")),
+                               "follower": rng.choice(names), "target": rng.choice(names)}
+                else:
+                    request = {"op": rng.choice(("profile", "followed", "followers")), "name": rng.choice(names)}
+                start = time.perf_counter_ns()
+                writer.write(json.dumps(request).encode() + b"\n")
+                await writer.drain()
+                response = json.loads(await reader.readline())
+                latencies.append(time.perf_counter_ns() - start)
+                if not response["ok"]:
+                    errors += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": elapsed,
+        "requests_per_sec": len(latencies) / elapsed,
+        "p50_us": percentile(latencies, 50) / 1000,
+        "p95_us": percentile(latencies, 95) / 1000,
+        "p99_us": percentile(latencies, 99) / 1000,
+    }
+
+
+def run_load_generator(host, port, clients, requests_per_client):
+    """Run the load test against a running server and print the report"""
+    report = asyncio.run(run_load_test(host, port, clients, requests_per_client))
+    print(f"{report['requests']:,} requests from {report['clients']:,} clients in {report['seconds']:.2f} s "
+          f"({report['requests_per_sec']:,.0f} req/s, {report['errors']} errors)")
+    print(f"Latency p50 {report['p50_us']:,.0f} us, p95 {report['p95_us']:,.0f} us, p99 {report['p99_us']:,.0f} us")
+
+
+def parse_args(argv=None):
+    """Command line options; with no command the interactive app runs"""
+    parser = argparse.ArgumentParser(description="Social media app built on a directed graph")
+    commands = parser.add_subparsers(dest="command")
+
+    followers = commands.add_parser("followers", help="benchmark follower lookups")
+    followers.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                           help="number of people per graph")
+    followers.add_argument("--following", type=int, default=10, help="average accounts followed per person")
+
+    ranking = commands.add_parser("pagerank", help="time PageRank on a random follow graph")
+    ranking.add_argument("--people", type=int, default=100000)
+    ranking.add_argument("--following", type=int, default=10, help="average accounts followed per person")
+    ranking.add_argument("--workers", type=int, default=1, help="worker processes")
+
+    memory = commands.add_parser("memory", help="compare Person memory use with tracemalloc")
+    memory.add_argument("--people", type=int, default=100000)
+
+    server = commands.add_parser("serve", help="serve the app over a JSON-lines socket")
+    server.add_argument("--host", default="127.0.0.1")
+    server.add_argument("--port", type=int, default=8765)
+    server.add_argument("--people", type=int, default=0, help="serve a random graph of this many people "
+                                                              "instead of the sample users")
+
+    loadtest = commands.add_parser("loadtest", help="generate load against a running server")
+    loadtest.add_argument("--host", default="127.0.0.1")
+    loadtest.add_argument("--port", type=int, default=8765)
+    loadtest.add_argument("--clients", type=int, default=1000)
+    loadtest.add_argument("--requests", type=int, default=20, help="requests per client")
+
+    return parser.parse_args(argv)
+
+
+def create_demo_app():
+    """Create the app with the sample users and follows"""
     app = SocialMediaApp()
 
     # Create at least 5 person objects (maximum 10)
@@ -173,6 +1304,28 @@ def run_social_media_app():
     app.follow_person("Vennis", "Teh Kai Shuang")
     app.follow_person("Teh Kai Shuang", "Teh Yao Sheng")
     app.follow_person("Vennis", "Eric Ho")
+    return app
+
+
+# People listed per page in the menu
+MENU_PAGE_SIZE = 20
+
+
+def _print_pages(pages):
+    """Print numbered pages of people, asking before each further page. Returns False if there were none"""
+    number = 0
+    for page in pages:
+        if number and input("Show more? (yes/no): ").lower() != "yes":
+            break
+        for person in page:
+            number += 1
+            print(f"{number}. {person.name}")
+    return number > 0
+
+
+def run_social_media_app():
+    """Run the social media app with a menu-driven interface"""
+    app = create_demo_app()
 
     while True:
         print("\n===== Social Media App =====")
@@ -209,13 +1362,9 @@ def run_social_media_app():
         elif choice == "3":
             # View followed accounts
             name = input("Enter the name of the user: ")
-            followed = app.get_followed_accounts(name)
-            if followed is not None:
+            if name in app.people:
                 print(f"\n--- Accounts followed by {name} ---")
-                if followed:
-                    for i, person in enumerate(followed, 1):
-                        print(f"{i}. {person.name}")
-                else:
+                if not _print_pages(app.iter_followed_accounts(name, MENU_PAGE_SIZE)):
                     print(f"{name} is not following anyone.")
             else:
                 print(f"User '{name}' not found.")
@@ -223,13 +1372,9 @@ def run_social_media_app():
         elif choice == "4":
             # View followers
             name = input("Enter the name of the user: ")
-            followers = app.get_followers(name)
-            if followers is not None:
+            if name in app.people:
                 print(f"\n--- Followers of {name} ---")
-                if followers:
-                    for i, person in enumerate(followers, 1):
-                        print(f"{i}. {person.name}")
-                else:
+                if not _print_pages(app.iter_followers(name, MENU_PAGE_SIZE)):
                     print(f"{name} has no followers.")
             else:
                 print(f"User '{name}' not found.")
@@ -284,4 +1429,17 @@ def run_social_media_app():
 
 
 if __name__ == "__main__":
-    run_social_media_app()
+    args = parse_args()
+    if args.command == "followers":
+        run_followers_benchmark(args.sizes, args.following)
+    elif args.command == "serve":
+        app = build_random_app(args.people) if args.people else create_demo_app()
+        asyncio.run(serve(app, args.host, args.port))
+    elif args.command == "loadtest":
+        run_load_generator(args.host, args.port, args.clients, args.requests)
+    elif args.command == "memory":
+        run_memory_benchmark(args.people)
+    elif args.command == "pagerank":
+        run_pagerank_benchmark(args.people, args.following, args.workers)
+    else:
+        run_social_media_app()
@@ -1,6 +1,23 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import queue
 import random
+import statistics
 import threading
 import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+# Two-sided 95% Student t critical values by degrees of freedom (normal beyond 30)
+T_CRITICAL_95 = [None, 12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+                 2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+                 2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
 
 # Generate 100 random numbers
 def generate_random_numbers():
@@ -10,35 +27,524 @@ def generate_random_numbers():
 def thread_task(result_list, index):
     result_list[index] = generate_random_numbers()
 
-# Run multithreading for 10 rounds
-def run_multithreading():
-    times = []
-    for _ in range(10):
-        results = [None, None, None]
-        threads = []
-
-        start = time.time_ns()
-        for i in range(3):
-            t = threading.Thread(target=thread_task, args=(results, i))
-            threads.append(t)
+# One multithreading round: 3 threads each generate 100 numbers
+def multithreading_round():
+    results = [None, None, None]
+    threads = []
+    for i in range(3):
+        t = threading.Thread(target=thread_task, args=(results, i))
+        threads.append(t)
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+# One non-threading round: generate the same 3 lists one after another
+def non_threading_round():
+    return [generate_random_numbers(), generate_random_numbers(), generate_random_numbers()]
+
+# Fill a preallocated buffer in place and record, for slot `index`, how long the
+# work waited to start after submitted_ns (dispatch) and how long the fill took (compute)
+def timed_fill(buffer, submitted_ns, dispatch_ns, compute_ns, index):
+    started = time.perf_counter_ns()
+    for i in range(len(buffer)):
+        buffer[i] = random.randint(0, 10000)
+    finished = time.perf_counter_ns()
+    dispatch_ns[index] = started - submitted_ns
+    compute_ns[index] = finished - started
+
+# Long-lived worker threads fed from a task queue. Result buffers and timing
+# slots are allocated once and reused by every round.
+class WorkerPool:
+    def __init__(self, workers=3, size=100):
+        self.buffers = [[0] * size for _ in range(workers)]
+        self.dispatch_ns = [0] * workers
+        self.compute_ns = [0] * workers
+        self.tasks = queue.SimpleQueue()
+        self.done = queue.SimpleQueue()
+        self.threads = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for t in self.threads:
             t.start()
-        for t in threads:
+
+    def _work(self):
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                return
+            index, submitted_ns = task
+            timed_fill(self.buffers[index], submitted_ns, self.dispatch_ns, self.compute_ns, index)
+            self.done.put(index)
+
+    # Hand one buffer to each worker (or only the first `tasks` buffers) and
+    # wait for them to finish. Dispatch is measured from the start of the round.
+    def run_round(self, tasks=None):
+        tasks = len(self.buffers) if tasks is None else tasks
+        submitted_ns = time.perf_counter_ns()
+        for index in range(tasks):
+            self.tasks.put((index, submitted_ns))
+        for _ in range(tasks):
+            self.done.get()
+        return self.buffers
+
+    def close(self):
+        for _ in self.threads:
+            self.tasks.put(None)
+        for t in self.threads:
             t.join()
-        end = time.time_ns()
-        times.append(end - start)
-    return times
 
-# Run without multithreading for 10 rounds
-def run_non_threading():
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# The multithreading round with the same instrumentation as WorkerPool.run_round:
+# a fresh thread per buffer, so dispatch includes thread creation and start-up
+def spawn_round(buffers, dispatch_ns, compute_ns):
+    threads = []
+    submitted_ns = time.perf_counter_ns()
+    for i, buffer in enumerate(buffers):
+        t = threading.Thread(target=timed_fill, args=(buffer, submitted_ns, dispatch_ns, compute_ns, i))
+        threads.append(t)
+        t.start()
+    for t in threads:
+        t.join()
+    return buffers
+
+# Time spawn-per-round threads against a warm WorkerPool, both measured from
+# the same point (the start of the round). Each mode reports:
+#   handoff - one task alone: from the start of the round until it starts
+#             running (thread creation and start vs. a queue put/get)
+#   queued  - every task of a full round, from the start of the round until it
+#             starts; beyond the hand-off this is time spent waiting for the
+#             GIL while earlier tasks compute
+#   compute - the fill itself, and round - a whole round
+def run_pool_comparison(rounds=10, warmup=2, workers=3, size=100):
+    def measure(run_round, dispatch_ns, compute_ns, tasks):
+        totals, dispatches, computes = [], [], []
+        for i in range(warmup + rounds):
+            start = time.perf_counter_ns()
+            run_round()
+            elapsed = time.perf_counter_ns() - start
+            if i >= warmup:
+                totals.append(elapsed)
+                dispatches.extend(dispatch_ns[:tasks])
+                computes.extend(compute_ns[:tasks])
+        return summarize_times(totals), summarize_times(dispatches), summarize_times(computes)
+
+    def compare(single_round, full_round, dispatch_ns, compute_ns):
+        handoff = measure(single_round, dispatch_ns, compute_ns, 1)[1]
+        round_times, queued, compute = measure(full_round, dispatch_ns, compute_ns, workers)
+        return {"round": round_times, "handoff": handoff, "queued": queued, "compute": compute}
+
+    buffers = [[0] * size for _ in range(workers)]
+    dispatch_ns = [0] * workers
+    compute_ns = [0] * workers
+    results = {"spawn": compare(lambda: spawn_round(buffers[:1], dispatch_ns, compute_ns),
+                                lambda: spawn_round(buffers, dispatch_ns, compute_ns),
+                                dispatch_ns, compute_ns)}
+    with WorkerPool(workers, size) as pool:
+        results["pool"] = compare(lambda: pool.run_round(1), pool.run_round, pool.dispatch_ns, pool.compute_ns)
+    return results
+
+# Run multithreading for a number of rounds (10 by default)
+def run_multithreading(rounds=10):
+    return benchmark(multithreading_round, rounds=rounds, warmup=0, inner_loops=1)["times"]
+
+# Run without multithreading for a number of rounds (10 by default)
+def run_non_threading(rounds=10):
+    return benchmark(non_threading_round, rounds=rounds, warmup=0, inner_loops=1)["times"]
+
+# Pick how many calls one timed round needs to last at least min_round_ns,
+# so sub-microsecond work is not swamped by timer resolution
+def calibrate_inner_loops(func, min_round_ns=1_000_000):
+    loops = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            func()
+        if time.perf_counter_ns() - start >= min_round_ns or loops >= 1 << 30:
+            return loops
+        loops *= 2
+
+# Time func with perf_counter_ns: warm-up calls first, then `rounds` timed rounds
+# of `inner_loops` calls each (auto-calibrated when None). Times are ns per call.
+def benchmark(func, rounds=10, warmup=2, inner_loops=None, min_round_ns=1_000_000):
+    for _ in range(warmup):
+        func()
+    if inner_loops is None:
+        inner_loops = calibrate_inner_loops(func, min_round_ns)
+
     times = []
-    for _ in range(10):
-        start = time.time_ns()
-        _ = generate_random_numbers()
-        _ = generate_random_numbers()
-        _ = generate_random_numbers()
-        end = time.time_ns()
-        times.append(end - start)
-    return times
+    for _ in range(rounds):
+        start = time.perf_counter_ns()
+        for _ in range(inner_loops):
+            func()
+        times.append(round((time.perf_counter_ns() - start) / inner_loops))
+
+    result = summarize_times(times)
+    result["warmup"] = warmup
+    result["inner_loops"] = inner_loops
+    return result
+
+# Nearest-rank percentile of an already sorted list
+def percentile(sorted_values, percent):
+    rank = max(int(round(percent / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+# Summary statistics for a list of per-round times (ns)
+def summarize_times(times):
+    ordered = sorted(times)
+    n = len(ordered)
+    mean = statistics.fmean(ordered)
+    stdev = statistics.stdev(ordered) if n > 1 else 0.0
+
+    # 95% confidence interval of the mean (Student t for small samples)
+    t_value = T_CRITICAL_95[n - 1] if 1 < n <= len(T_CRITICAL_95) else 1.96
+    margin = t_value * stdev / math.sqrt(n) if n > 1 else 0.0
+
+    # Tukey fences: rounds outside 1.5 IQR of the quartiles count as outliers
+    q1 = percentile(ordered, 25)
+    q3 = percentile(ordered, 75)
+    low_fence = q1 - 1.5 * (q3 - q1)
+    high_fence = q3 + 1.5 * (q3 - q1)
+
+    return {
+        "rounds": n,
+        "times": list(times),
+        "mean": mean,
+        "median": statistics.median(ordered),
+        "stdev": stdev,
+        "min": ordered[0],
+        "max": ordered[-1],
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "ci95_low": mean - margin,
+        "ci95_high": mean + margin,
+        "outliers": sum(1 for t in ordered if t < low_fence or t > high_fence),
+    }
+
+# The difference is only called significant when the 95% intervals do not overlap
+def is_significant(a, b):
+    return a["ci95_high"] < b["ci95_low"] or b["ci95_high"] < a["ci95_low"]
+
+# Generate `count` random numbers (the unit of work every backend shares out)
+def generate_chunk(count):
+    return [random.randint(0, 10000) for _ in range(count)]
+
+# Split `total` numbers into `parts` nearly equal chunk sizes
+def split_work(total, parts):
+    base, extra = divmod(total, parts)
+    return [base + (1 if i < extra else 0) for i in range(parts)]
+
+# Fresh RNG state in each worker process (forked children would otherwise
+# all continue the parent's random sequence)
+def reseed_worker():
+    random.seed()
+
+# Serial backend: every chunk on the calling thread
+class SerialBackend:
+    def __init__(self, workers):
+        self.workers = workers
+
+    def run(self, total):
+        return sum(len(generate_chunk(count)) for count in split_work(total, self.workers))
+
+    def close(self):
+        pass
+
+# Thread pool backend: chunks spread over a ThreadPoolExecutor
+class ThreadPoolBackend:
+    def __init__(self, workers):
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def run(self, total):
+        return sum(map(len, self.executor.map(generate_chunk, split_work(total, self.workers))))
+
+    def close(self):
+        self.executor.shutdown()
+
+# Process pool backend: chunks generated in worker processes and pickled back
+class ProcessPoolBackend:
+    def __init__(self, workers):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=reseed_worker)
+
+    def run(self, total):
+        return sum(map(len, self.executor.map(generate_chunk, split_work(total, self.workers))))
+
+    def close(self):
+        self.executor.shutdown()
+
+# Process pool for workers that attach to the parent's shared memory blocks.
+# The parent's resource tracker is started first so that every worker shares
+# it, whatever the start method (a forked worker would otherwise start its
+# own tracker, which unlinks the blocks it saw when the worker exits).
+def shared_memory_pool(workers, initializer=None):
+    resource_tracker.ensure_running()
+    return multiprocessing.Pool(workers, initializer=initializer)
+
+# Shared memory blocks attached in this worker process, by name
+_attached_blocks = {}
+
+# Attach (once per process) to the shared memory block called block_name.
+# The worker registers the block with the shared tracker again, which is a
+# no-op, and the parent's unlink() is the only unregister.
+def attach_block(block_name):
+    if block_name not in _attached_blocks:
+        for old in _attached_blocks.values():
+            old.close()
+        _attached_blocks.clear()
+        _attached_blocks[block_name] = shared_memory.SharedMemory(name=block_name)
+    return _attached_blocks[block_name]
+
+# Fill numbers[start:start + count] of a shared memory block in a worker process
+def fill_shared_chunk(block_name, start, count):
+    numbers = attach_block(block_name).buf.cast("q")
+    randint = random.randint
+    for i in range(start, start + count):
+        numbers[i] = randint(0, 10000)
+    numbers.release()
+    return count
+
+# multiprocessing backend: worker processes write straight into one shared
+# memory block, so no results are pickled back
+class SharedMemoryBackend:
+    def __init__(self, workers):
+        self.workers = workers
+        self.pool = shared_memory_pool(workers, initializer=reseed_worker)
+        self.block = None
+
+    def run(self, total):
+        # Grow the shared block when a bigger task comes along
+        if self.block is None or self.block.size < total * 8:
+            self._release_block()
+            self.block = shared_memory.SharedMemory(create=True, size=max(total, 1) * 8)
+
+        tasks = []
+        start = 0
+        for count in split_work(total, self.workers):
+            tasks.append((self.block.name, start, count))
+            start += count
+        return sum(self.pool.starmap(fill_shared_chunk, tasks))
+
+    def _release_block(self):
+        if self.block is not None:
+            self.block.close()
+            self.block.unlink()
+            self.block = None
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        self._release_block()
+
+# asyncio backend: chunks awaited from an event loop via run_in_executor
+class AsyncioBackend:
+    def __init__(self, workers):
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.loop = asyncio.new_event_loop()
+
+    async def _gather(self, total):
+        chunks = await asyncio.gather(*(self.loop.run_in_executor(self.executor, generate_chunk, count)
+                                        for count in split_work(total, self.workers)))
+        return sum(map(len, chunks))
+
+    def run(self, total):
+        return self.loop.run_until_complete(self._gather(total))
+
+    def close(self):
+        self.loop.close()
+        self.executor.shutdown()
+
+# Values drawn by the seeded generators (same range as generate_random_numbers)
+RANDOM_POPULATION = range(0, 10001)
+
+# Numbers drawn per bulk call; bounds the temporary list fill_block builds
+FILL_CHUNK = 4096
+
+# Derive independent child seeds from a root seed, in the spirit of NumPy's
+# SeedSequence.spawn: child i of a root is always the same 128-bit seed
+def spawn_seeds(root, count, first=0):
+    return [int.from_bytes(hashlib.blake2b(f"{root}:{i}".encode(), digest_size=16).digest(), "little")
+            for i in range(first, first + count)]
+
+# Fill out[start:start + count] from a private generator, FILL_CHUNK numbers per
+# bulk call written straight into the destination, so the only temporary is one
+# chunk-sized list (not a second copy of the block)
+def fill_block(seed, out, start, count):
+    choices = random.Random(seed).choices
+    end = start + count
+    for chunk_start in range(start, end, FILL_CHUNK):
+        chunk_end = min(chunk_start + FILL_CHUNK, end)
+        out[chunk_start:chunk_end] = array("q", choices(RANDOM_POPULATION, k=chunk_end - chunk_start))
+
+# fill_block into a shared memory block from a worker process
+def fill_shared_block(block_name, seed, start, count):
+    numbers = attach_block(block_name).buf.cast("q")
+    fill_block(seed, numbers, start, count)
+    numbers.release()
+    return count
+
+# Seeded generation shared by threads and processes: every worker owns an
+# independently seeded random.Random and writes a whole block of one
+# preallocated array, so nothing is shared between workers and the output for
+# a given root seed does not depend on scheduling. mode is "thread",
+# "process", or "serial" (the same blocks filled one after another here,
+# giving identical output).
+class SeededGenerator:
+    def __init__(self, workers, seed=None, mode="thread"):
+        if mode not in ("serial", "thread", "process"):
+            raise ValueError(f"Unknown mode: {mode!r}")
+        self.workers = workers
+        self.root = seed if seed is not None else int.from_bytes(os.urandom(16), "little")
+        self.spawned = 0
+        self.mode = mode
+        if mode == "process":
+            self.pool = shared_memory_pool(workers)
+            self.block = None
+        elif mode == "thread":
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    # Next `workers` child seeds; each call gets fresh ones
+    def _spawn(self):
+        seeds = spawn_seeds(self.root, self.workers, self.spawned)
+        self.spawned += self.workers
+        return seeds
+
+    # Generate `total` numbers into a new array('q')
+    def generate(self, total):
+        tasks = []
+        start = 0
+        for seed, count in zip(self._spawn(), split_work(total, self.workers)):
+            tasks.append((seed, start, count))
+            start += count
+
+        if self.mode == "serial":
+            out = array("q", bytes(8 * total))
+            for seed, start, count in tasks:
+                fill_block(seed, out, start, count)
+            return out
+        if self.mode == "thread":
+            out = array("q", bytes(8 * total))
+            list(self.executor.map(lambda task: fill_block(task[0], out, task[1], task[2]), tasks))
+            return out
+
+        if self.block is None or self.block.size < total * 8:
+            self._release_block()
+            self.block = shared_memory.SharedMemory(create=True, size=max(total, 1) * 8)
+        self.pool.starmap(fill_shared_block, [(self.block.name, *task) for task in tasks])
+        out = array("q")
+        out.frombytes(self.block.buf[:total * 8])
+        return out
+
+    def run(self, total):
+        return len(self.generate(total))
+
+    def _release_block(self):
+        if self.block is not None:
+            self.block.close()
+            self.block.unlink()
+            self.block = None
+
+    def close(self):
+        if self.mode == "process":
+            self.pool.close()
+            self.pool.join()
+            self._release_block()
+        elif self.mode == "thread":
+            self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Sweep backends for the seeded generator in each mode
+def seeded_serial_backend(workers):
+    return SeededGenerator(workers, mode="serial")
+
+def seeded_thread_backend(workers):
+    return SeededGenerator(workers)
+
+def seeded_process_backend(workers):
+    return SeededGenerator(workers, mode="process")
+
+BACKENDS = {
+    "serial": SerialBackend,
+    "thread": ThreadPoolBackend,
+    "process": ProcessPoolBackend,
+    "shared_memory": SharedMemoryBackend,
+    "asyncio": AsyncioBackend,
+    "seeded_serial": seeded_serial_backend,
+    "seeded_thread": seeded_thread_backend,
+    "seeded_process": seeded_process_backend,
+}
+
+# Serial backend each backend's speedup is measured against ("serial" unless
+# listed). The seeded backends generate numbers differently (bulk choices
+# rather than per-call randint), so they are only compared with each other.
+SWEEP_BASELINES = {
+    "seeded_serial": "seeded_serial",
+    "seeded_thread": "seeded_serial",
+    "seeded_process": "seeded_serial",
+}
+
+# Time every backend at every worker count and task size. Speedup is against
+# the backend's serial baseline (SWEEP_BASELINES, one worker) for the same task
+# size; efficiency is speedup / workers.
+def run_scaling_sweep(backends=tuple(BACKENDS), worker_counts=None, task_sizes=None, rounds=5, warmup=1):
+    worker_counts = worker_counts or list(range(1, (os.cpu_count() or 1) + 1))
+    task_sizes = task_sizes or [10 ** exponent for exponent in range(2, 8)]
+
+    baselines = {}
+    for baseline_name in dict.fromkeys(SWEEP_BASELINES.get(name, "serial") for name in backends):
+        serial = BACKENDS[baseline_name](1)
+        try:
+            baselines[baseline_name] = {size: benchmark(lambda: serial.run(size), rounds, warmup, 1)["median"]
+                                        for size in task_sizes}
+        finally:
+            serial.close()
+
+    rows = []
+    for name in backends:
+        baseline_name = SWEEP_BASELINES.get(name, "serial")
+        baseline = baselines[baseline_name]
+        for workers in worker_counts:
+            backend = BACKENDS[name](workers)
+            try:
+                for size in task_sizes:
+                    result = benchmark(lambda: backend.run(size), rounds, warmup, 1)
+                    speedup = baseline[size] / result["median"]
+                    rows.append({
+                        "backend": name,
+                        "baseline": baseline_name,
+                        "workers": workers,
+                        "task_size": size,
+                        "median_ns": result["median"],
+                        "p95_ns": result["p95"],
+                        "speedup": speedup,
+                        "efficiency": speedup / workers,
+                    })
+            finally:
+                backend.close()
+    return rows
+
+# Display the sweep as one table per backend
+def display_sweep(rows):
+    for name, baseline in dict.fromkeys((row["backend"], row["baseline"]) for row in rows):
+        print(f"\nBackend: {name} (speedup vs {baseline})")
+        print("+---------+--------------+--------------------+-----------+------------+")
+        print("| Workers | Task size    | Median time (ns)   | Speedup   | Efficiency |")
+        print("+---------+--------------+--------------------+-----------+------------+")
+        for row in rows:
+            if row["backend"] == name:
+                print(f"| {row['workers']:<7} | {format_num(row['task_size']):<12} | {format_num(int(row['median_ns'])):<18} "
+                      f"| {row['speedup']:<9.2f} | {row['efficiency']:<10.2f} |")
+        print("+---------+--------------+--------------------+-----------+------------+")
 
 # Format number with commas and +/- sign for differences
 def format_diff(n):
@@ -49,6 +555,8 @@ def format_num(n):
 
 # Display final results
 def display_results(mt_times, nt_times):
+    rounds = len(mt_times)
+
     print("\nRound-by-Round Performance Comparison:")
     print("+--------+--------------------------+-------------------------------+-------------------------+")
     print("| Round  | Multithreading Time (ns) | Non-Multithreading Time (ns)  | Difference (ns)         |")
@@ -57,7 +565,7 @@ def display_results(mt_times, nt_times):
     total_mt = 0
     total_nt = 0
 
-    for i in range(10):
+    for i in range(rounds):
         diff = mt_times[i] - nt_times[i]
         total_mt += mt_times[i]
         total_nt += nt_times[i]
@@ -65,8 +573,8 @@ def display_results(mt_times, nt_times):
 
     print("+--------+--------------------------+-------------------------------+-------------------------+\n")
 
-    avg_mt = total_mt / 10
-    avg_nt = total_nt / 10
+    avg_mt = total_mt / rounds
+    avg_nt = total_nt / rounds
     avg_diff = avg_mt - avg_nt
 
     print("Summary of Results:")
@@ -77,8 +585,113 @@ def display_results(mt_times, nt_times):
     print(f"| Average Time | {format_num(int(avg_mt)):<26} | {format_num(int(avg_nt)):<29} | {format_diff(int(avg_diff)):<23} |")
     print("+--------------+----------------------------+-------------------------------+-------------------------+")
 
+# Display the statistics of two benchmark results side by side
+def display_statistics(mt_result, nt_result):
+    print("\nStatistics (ns per round):")
+    print("+--------------+----------------------------+-------------------------------+-------------------------+")
+    print("|   Metric     | Multithreading (ns)        | Non-Multithreading (ns)       | Difference (ns)         |")
+    print("+--------------+----------------------------+-------------------------------+-------------------------+")
+    for label, key in (("Median", "median"), ("Mean", "mean"), ("Std Dev", "stdev"), ("p95", "p95"), ("p99", "p99")):
+        mt = int(mt_result[key])
+        nt = int(nt_result[key])
+        print(f"| {label:<12} | {format_num(mt):<26} | {format_num(nt):<29} | {format_diff(mt - nt):<23} |")
+    mt_ci = f"{format_num(int(mt_result['ci95_low']))} - {format_num(int(mt_result['ci95_high']))}"
+    nt_ci = f"{format_num(int(nt_result['ci95_low']))} - {format_num(int(nt_result['ci95_high']))}"
+    print(f"| {'95% CI':<12} | {mt_ci:<26} | {nt_ci:<29} | {'':<23} |")
+    print(f"| {'Outliers':<12} | {mt_result['outliers']:<26} | {nt_result['outliers']:<29} | {'':<23} |")
+    print("+--------------+----------------------------+-------------------------------+-------------------------+")
+    verdict = "significant" if is_significant(mt_result, nt_result) else "NOT significant (intervals overlap)"
+    print(f"Difference in means is {verdict} at 95% confidence")
+
+# Display spawn-per-round vs warm pool: median and mean of each phase
+def display_pool_comparison(results):
+    print("\nThread spawn vs persistent pool (ns):")
+    print("+------------------+----------------------------+-------------------------------+-------------------------+")
+    print("|   Metric         | Spawn per round (ns)       | Persistent pool (ns)          | Difference (ns)         |")
+    print("+------------------+----------------------------+-------------------------------+-------------------------+")
+    for phase in ("round", "handoff", "queued", "compute"):
+        for stat in ("median", "mean"):
+            spawn = int(results["spawn"][phase][stat])
+            pool = int(results["pool"][phase][stat])
+            label = f"{phase.capitalize()} {stat}"
+            print(f"| {label:<16} | {format_num(spawn):<26} | {format_num(pool):<29} | {format_diff(pool - spawn):<23} |")
+    print("+------------------+----------------------------+-------------------------------+-------------------------+")
+    print("Per task, from the start of the round: handoff = one task alone until it starts;")
+    print("queued = every task of a full round until it starts (hand-off plus waiting for the GIL)")
+
+# Command line options
+# Defaults of the options that may be given before or after the subcommand
+COMMAND_DEFAULTS = {
+    None: {"rounds": 10, "warmup": 2},
+    "sweep": {"rounds": 5},
+    "pool": {"rounds": 100, "warmup": 5},
+}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Multithreading vs non-multithreading timing")
+    parser.add_argument("--rounds", type=int, help="timed rounds per mode (default: 10, sweep 5, pool 100)")
+    parser.add_argument("--warmup", type=int, help="untimed warm-up rounds per mode (default: 2, pool 5)")
+    parser.add_argument("--inner-loops", type=int, default=1,
+                        help="calls per timed round (0 = calibrate automatically)")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+
+    # The subcommands repeat --rounds/--warmup/--json without defaults of
+    # their own, so they never overwrite a value given before the subcommand
+    commands = parser.add_subparsers(dest="command")
+    sweep = commands.add_parser("sweep", help="compare executor backends across worker counts and task sizes")
+    sweep.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    sweep.add_argument("--workers", type=int, nargs="+", help="worker counts (default: 1..cores)")
+    sweep.add_argument("--sizes", type=int, nargs="+", help="numbers per task (default: 100..10,000,000)")
+    sweep.add_argument("--rounds", type=int, default=argparse.SUPPRESS, help="default: 5")
+    sweep.add_argument("--json", default=argparse.SUPPRESS, help="also write the results to this JSON file")
+
+    pool = commands.add_parser("pool", help="compare spawning threads per round with a persistent worker pool")
+    pool.add_argument("--rounds", type=int, default=argparse.SUPPRESS, help="default: 100")
+    pool.add_argument("--warmup", type=int, default=argparse.SUPPRESS, help="default: 5")
+    pool.add_argument("--workers", type=int, default=3)
+    pool.add_argument("--size", type=int, default=100, help="numbers generated per task")
+    pool.add_argument("--json", default=argparse.SUPPRESS, help="also write the results to this JSON file")
+
+    args = parser.parse_args(argv)
+    for name, value in COMMAND_DEFAULTS[args.command].items():
+        if getattr(args, name) is None:
+            setattr(args, name, value)
+    return args
+
+# Run the backend sweep and print (and optionally save) the curves
+def main_sweep(args):
+    rows = run_scaling_sweep(args.backends, args.workers, args.sizes, args.rounds)
+    display_sweep(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+# Run the spawn vs pool comparison and print (and optionally save) it
+def main_pool(args):
+    results = run_pool_comparison(args.rounds, args.warmup, args.workers, args.size)
+    display_pool_comparison(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
 # Main
 if __name__ == "__main__":
-    mt_results = run_multithreading()
-    nt_results = run_non_threading()
-    display_results(mt_results, nt_results)
+    args = parse_args()
+    if args.command == "sweep":
+        main_sweep(args)
+        raise SystemExit
+    if args.command == "pool":
+        main_pool(args)
+        raise SystemExit
+    inner_loops = args.inner_loops or None
+    mt_result = benchmark(multithreading_round, args.rounds, args.warmup, inner_loops)
+    nt_result = benchmark(non_threading_round, args.rounds, args.warmup, inner_loops)
+    display_results(mt_result["times"], nt_result["times"])
+    display_statistics(mt_result, nt_result)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"multithreading": mt_result, "non_threading": nt_result}, f, indent=2)
+        print(f"\nResults written to {args.json}")
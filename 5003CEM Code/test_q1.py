@@ -0,0 +1,63 @@
+import random
+from collections import Counter
+
+import pytest
+
+import q1
+
+
+def _fields(ic, ic_format):
+    """(year, month, day, bp) of an integer IC"""
+    digits = f"{ic:0{ic_format}d}"
+    year_digits = 2 if ic_format == 12 else 4
+    date_end = year_digits + 4
+    return (int(digits[:year_digits]), int(digits[year_digits:year_digits + 2]),
+            int(digits[year_digits + 2:date_end]), int(digits[date_end:date_end + 2]))
+
+
+def _field_sets(ic_format, count=20000):
+    ics = q1.generate_ic_batch(count, ic_format, random.Random(6)).tolist()
+    return [Counter(field) for field in zip(*(_fields(ic, ic_format) for ic in ics))]
+
+
+def test_generate_ic_batch_12_field_ranges():
+    years, months, days, bps = _field_sets(12)
+    assert set(years) == set(range(70, 100)) | set(range(0, 21))
+    assert set(months) == set(range(1, 13))
+    assert set(days) == set(range(1, 29))
+    assert set(bps) == set(q1.BP_CODES)
+    # Half the ICs come from each century
+    born_1900s = sum(n for year, n in years.items() if year >= 70)
+    assert abs(born_1900s / sum(years.values()) - 0.5) < 0.02
+
+
+def test_generate_ic_batch_16_field_ranges():
+    years, months, days, bps = _field_sets(16)
+    assert set(years) == set(range(1950, 2024))
+    assert set(months) == set(range(1, 13))
+    assert set(days) == set(range(1, 29))
+    assert set(bps) == set(q1.BP_CODES)
+
+
+def test_generate_ic_batch_is_reproducible():
+    for ic_format in (12, 16):
+        first = q1.generate_ic_batch(5000, ic_format, random.Random(1))
+        assert first == q1.generate_ic_batch(5000, ic_format, random.Random(1))
+        assert len(first) == 5000
+
+
+def test_save_rejects_hash_names_the_header_cannot_hold(tmp_path):
+    name = "a_very_long_hash_name"
+    q1.register_hash_function(name)(q1._xxhash_mix)
+    try:
+        table = q1.ICHashTable(101, hash_function=name)
+        table.insert(123456789012, 12)
+        with pytest.raises(ValueError):
+            table.save(tmp_path / "table.bin")
+    finally:
+        del q1.HASH_FUNCTIONS[name]
+
+    table = q1.ICHashTable(101, hash_function="xxhash")
+    table.insert(123456789012, 12)
+    table.save(tmp_path / "table.bin")
+    assert 123456789012 in q1.ICHashTable.load(tmp_path / "table.bin")
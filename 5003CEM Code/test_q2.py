@@ -0,0 +1,130 @@
+import os
+import random
+
+import pytest
+
+from q2 import Person, PersistentSocialMediaApp, SocialMediaApp
+
+
+def _state(app):
+    """Everyone's profile fields and the names they follow"""
+    return {name: ((person.gender, person.biography, person.is_private),
+                   sorted(followed.name for followed in app.get_followed_accounts(name)))
+            for name, person in app.people.items()}
+
+
+def _populate(app, names):
+    for name in names:
+        app.add_person(Person(name, "F", f"{name}'s bio"))
+    for follower, target in zip(names, names[1:] + names[:1]):
+        app.follow_person(follower, target)
+    app.follow_person(names[0], names[2])
+    app.unfollow_person(names[1], names[2])
+
+
+def test_wal_replay_cuts_off_a_torn_final_line(tmp_path):
+    directory = str(tmp_path)
+    with PersistentSocialMediaApp(directory) as app:
+        _populate(app, ["alice", "bob", "carol", "dave"])
+        expected = _state(app)
+
+    # A crash in the middle of appending the next entry
+    with open(os.path.join(directory, "wal.log"), "a", encoding="utf-8") as f:
+        f.write('[99, "follow", "dave", "ali')
+
+    with PersistentSocialMediaApp(directory) as app:
+        assert _state(app) == expected
+        app.follow_person("dave", "bob")
+        expected = _state(app)
+
+    # The entry written after recovery must not be glued to the torn line
+    with PersistentSocialMediaApp(directory) as app:
+        assert _state(app) == expected
+
+
+def test_recovery_after_compaction(tmp_path):
+    directory = str(tmp_path)
+    with PersistentSocialMediaApp(directory, snapshot_every=3) as app:
+        _populate(app, [f"user{i}" for i in range(10)])
+        app.unfollow_person("user0", "user2")
+        expected = _state(app)
+
+    with PersistentSocialMediaApp(directory, snapshot_every=3) as app:
+        assert _state(app) == expected
+        app.follow_person("user5", "user0")
+        expected = _state(app)
+
+    with PersistentSocialMediaApp(directory, snapshot_every=3) as app:
+        assert _state(app) == expected
+    assert len([name for name in os.listdir(directory) if name.endswith(".edges")]) == 1
+
+
+def test_bulk_loads_compact_into_separate_edge_files(tmp_path):
+    # Bulk loads compact without logging, so consecutive snapshots share a
+    # sequence number and must not reuse the same edge file
+    directory = str(tmp_path)
+    with PersistentSocialMediaApp(directory) as app:
+        app.load_people(["alice", "bob", "carol"])
+        app.load_follows(["alice,bob"])
+        app.load_follows(["bob,carol", "carol,alice"])
+        expected = _state(app)
+
+    # Leftover from a compaction interrupted before its edge file was renamed
+    with open(os.path.join(directory, "snapshot-99.edges.tmp"), "wb") as f:
+        f.write(b"\0" * 6)
+
+    with PersistentSocialMediaApp(directory) as app:
+        assert _state(app) == expected
+        app.compact()
+    assert [name for name in os.listdir(directory) if ".edges" in name] == ["snapshot-4.edges"]
+
+
+@pytest.mark.parametrize("direction", ["followers", "followed"])
+def test_paging_survives_follows_and_unfollows_between_pages(direction):
+    rng = random.Random(20)
+    app = SocialMediaApp()
+    names = [f"user{i}" for i in range(200)]
+    for name in names:
+        app.add_person(Person(name))
+
+    def follow(other, present):
+        pair = (other, "user0") if direction == "followers" else ("user0", other)
+        (app.follow_person if present else app.unfollow_person)(*pair)
+
+    get_page = app.get_followers_page if direction == "followers" else app.get_followed_accounts_page
+    current = set(rng.sample(names[1:], 120))
+    for name in sorted(current, key=names.index):
+        follow(name, True)
+
+    seen = []
+    left = set()  # Unfollowed while paging after already being listed
+    cursor = None
+    while True:
+        page, cursor = get_page("user0", 7, cursor)
+        names_on_page = [person.name for person in page]
+        # Only current followers are listed
+        assert set(names_on_page) <= current
+        seen.extend(names_on_page)
+        if cursor is None:
+            break
+        for name in rng.sample(names[1:], 6):
+            present = rng.random() < 0.5
+            if not present and name in current and name in seen:
+                left.add(name)
+            follow(name, present)
+            (current.add if present else current.discard)(name)
+
+    # Everyone following at the end was listed, and only people who left after
+    # being listed and came back can be listed twice
+    assert current <= set(seen)
+    repeated = {name for name in seen if seen.count(name) > 1}
+    assert repeated <= left
+
+
+def test_paging_rejects_bad_limits_and_cursors():
+    app = SocialMediaApp()
+    app.add_person(Person("alice"))
+    with pytest.raises(ValueError):
+        app.get_followers_page("alice", 0)
+    with pytest.raises(ValueError):
+        app.get_followers_page("alice", 10, "not a cursor")